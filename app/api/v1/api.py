@@ -3,7 +3,8 @@ API router aggregation for v1.
 """
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import qualifications, subjects, seasons, downloads
+from app.api.v1.endpoints import qualifications, subjects, seasons, downloads, admin
+from app.core.config import settings
 
 api_router = APIRouter()
 
@@ -31,3 +32,11 @@ api_router.include_router(
     prefix="/downloads",
     tags=["downloads"],
 )
+
+# Without a token nobody could use the admin endpoints, so don't expose them
+if settings.ADMIN_TOKEN:
+    api_router.include_router(
+        admin.router,
+        prefix="/admin",
+        tags=["admin"],
+    )
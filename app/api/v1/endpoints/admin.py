@@ -0,0 +1,52 @@
+"""
+API endpoints for administrative tasks.
+Only mounted when settings.ADMIN_TOKEN is set, and every request must carry
+it as "Authorization: Bearer <token>".
+"""
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.services import cache_service
+
+
+def require_admin_token(authorization: Optional[str] = Header(None)):
+    """
+    Reject requests without the admin token.
+    
+    Args:
+        authorization: Authorization header
+    """
+    scheme, _, token = (authorization or "").partition(" ")
+    # Constant-time comparison, so the token can't be guessed byte by byte
+    if (
+        scheme.lower() != "bearer"
+        or not settings.ADMIN_TOKEN
+        or not secrets.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode())
+    ):
+        raise HTTPException(
+            status_code=401,
+            detail="Admin token required",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+router = APIRouter(dependencies=[Depends(require_admin_token)])
+
+
+@router.post("/cache/invalidate")
+async def invalidate_cache():
+    """
+    Clear all cached qualifications, subjects, seasons and file counts.
+    The next request for each will scrape PapaCambridge again.
+    
+    Returns:
+        Success message
+    """
+    # Clears the second-level cache too (Redis or SQLite), so off the event loop
+    await run_in_threadpool(cache_service.clear_cache)
+    
+    return {"message": "Cache invalidated"}
@@ -1,34 +1,41 @@
 """
 API endpoints for bulk downloads.
 """
-from fastapi import APIRouter, HTTPException, Path, BackgroundTasks
-from fastapi.responses import FileResponse, StreamingResponse, JSONResponse
-from pathlib import Path as PathLib
-import json
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse, ORJSONResponse, Response
+from uuid import UUID
 
 from app.models.download import (
     BulkDownloadRequest,
     BulkDownloadResponse,
-    DownloadProgress,
     JobStatus,
 )
 from app.services import download_service
-from app.core.config import settings
 
 router = APIRouter()
 
+# Pre-serialised body for the common "job not found" case (stale tabs and
+# bots polling expired jobs), so it skips the raise-and-handle path
+_JOB_404_BODY = b'{"detail":"Job not found. Please start a new download."}'
+
+
+def _job_not_found() -> Response:
+    """Build the 404 response for an unknown job."""
+    return Response(content=_JOB_404_BODY, status_code=404, media_type="application/json")
+
 
 @router.post("/bulk", response_model=BulkDownloadResponse, status_code=202)
 async def start_bulk_download(
     request: BulkDownloadRequest,
-    background_tasks: BackgroundTasks
+    http_request: Request,
 ):
     """
     Start a bulk download job.
     
     Args:
         request: Download request with subjects and seasons
-        background_tasks: FastAPI background tasks
+        http_request: Incoming HTTP request (gives access to the job queue)
     
     Returns:
         Job ID and initial status
@@ -41,45 +48,45 @@ async def start_bulk_download(
         if not request.seasons:
             raise HTTPException(status_code=400, detail="No seasons selected")
         
-        # Create job IMMEDIATELY
-        job_id = download_service.create_download_job(
+        # "stream" jobs download while their ZIP is fetched from /zip;
+        # anything else is a regular ZIP job
+        if request.download_method == "stream":
+            job_id = await run_in_threadpool(
+                download_service.create_download_job,
+                qualification=request.qualification,
+                subjects=request.subjects,
+                seasons=request.seasons,
+                download_method="stream"
+            )
+            return ORJSONResponse({
+                "job_id": str(job_id),
+                "status": "ready",
+                "total_files": 0,
+                "message": "Ready. Download the ZIP to start.",
+            }, status_code=202)
+        
+        # Create job IMMEDIATELY, already in the "initializing" state
+        # (writes the job file, so off the event loop)
+        job_id = await run_in_threadpool(
+            download_service.create_download_job,
             qualification=request.qualification,
             subjects=request.subjects,
             seasons=request.seasons,
-            download_method="zip"  # Always ZIP
+            download_method="zip"
         )
         
-        # Verify job was created
-        job = download_service.get_job_status(job_id)
-        if not job:
-            raise HTTPException(
-                status_code=500,
-                detail="Failed to create job.",
-            )
+        # Hand the job to the download workers (they do all the heavy work)
+        http_request.app.state.dl_queue.put_nowait(job_id)
         
-        # Set initial status and save immediately
-        job["status"] = "initializing"
-        job["message"] = "Starting download... Please wait."
-        
-        # Save job to file immediately
-        download_service.save_job_to_file(job_id, job)
-        
-        # Start download in background (this does all the heavy work)
-        background_tasks.add_task(
-            download_service.download_bulk_files,
-            request.qualification,
-            request.subjects,
-            request.seasons,
-            job_id
-        )
-        
-        # Return IMMEDIATELY - don't wait for anything
-        return BulkDownloadResponse(
-            job_id=job_id,
-            status="initializing",
-            total_files=0,  # Will be updated by background task
-            message="Starting download... Please wait.",
-        )
+        # Return IMMEDIATELY - the rest of the job state is polled via /progress
+        return ORJSONResponse({
+            "job_id": str(job_id),
+            "status": "initializing",
+            "total_files": 0,  # Will be updated by the download worker
+            "message": "Starting download... Please wait.",
+        }, status_code=202)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -87,49 +94,72 @@ async def start_bulk_download(
         )
 
 
-@router.get("/{job_id}/progress", response_model=DownloadProgress)
-async def get_download_progress(job_id: str):
+@router.get("/{job_id}/progress")
+async def get_download_progress(job_id: UUID, request: Request):
     """
     Get the progress of a download job.
+    Honours If-None-Match, so polls between changes get an empty 304.
     
     Args:
         job_id: The job ID
+        request: Incoming HTTP request (for If-None-Match)
     
     Returns:
-        Current download progress
+        Current download progress (DownloadProgress fields)
     """
-    job = download_service.get_job_status(job_id)
+    progress = await download_service.get_progress_blob(job_id)
     
-    if not job:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Job '{job_id}' not found. Please start a new download.",
-        )
+    if progress is None:
+        return _job_not_found()
+    blob, etag = progress
     
-    # Build progress response
-    progress_data = {
-        "job_id": job["job_id"],
-        "status": job["status"],
-        "current_file": job["current_file"],
-        "total_files": job["total_files"],
-        "percentage": job["percentage"],
-        "message": job["message"],
-        "downloaded_files": job["downloaded_files"],
-        "failed_files": job["failed_files"],
-        "errors": job["errors"],
-        "zip_path": job.get("zip_path"),
-        "zip_filename": job.get("zip_filename"),
+    # no-cache makes browsers revalidate every poll instead of reusing the body
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
     }
     
-    # Add direct download URLs if available
-    if job.get("direct_download_urls"):
-        progress_data["direct_download_urls"] = job["direct_download_urls"]
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
     
-    return DownloadProgress(**progress_data)
+    # Already serialised by the service; skip Pydantic on this polled endpoint
+    return Response(content=blob, media_type="application/json", headers=headers)
+
+
+@router.get("/{job_id}/events")
+async def stream_download_progress(job_id: UUID):
+    """
+    Stream the progress of a download job as Server-Sent Events.
+    An event is pushed whenever the job changes, so clients don't need to poll
+    /progress (which remains available as a fallback).
+    
+    Args:
+        job_id: The job ID
+    
+    Returns:
+        text/event-stream of progress updates
+    """
+    job = await download_service.get_job_status_async(job_id)
+    
+    if not job:
+        return _job_not_found()
+    
+    async def event_gen():
+        async for state in download_service.job_stream(job_id):
+            yield b"data: " + state + b"\n\n"
+    
+    return StreamingResponse(
+        event_gen(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
 
 
 @router.get("/{job_id}", response_model=JobStatus)
-async def get_job_status(job_id: str):
+async def get_job_status(job_id: UUID):
     """
     Get complete job status.
     
@@ -139,13 +169,10 @@ async def get_job_status(job_id: str):
     Returns:
         Complete job status
     """
-    job = download_service.get_job_status(job_id)
+    job = await download_service.get_job_status_async(job_id)
     
     if not job:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Job '{job_id}' not found",
-        )
+        return _job_not_found()
     
     return JobStatus(
         job_id=job["job_id"],
@@ -157,35 +184,57 @@ async def get_job_status(job_id: str):
         total_files=job["total_files"],
         percentage=job["percentage"],
         message=job["message"],
+        downloaded_count=job.get("downloaded_count", len(job["downloaded_files"])),
+        failed_count=job.get("failed_count", len(job["failed_files"])),
         downloaded_files=job["downloaded_files"],
         failed_files=job["failed_files"],
         errors=job["errors"],
         created_at=job["created_at"],
         started_at=job.get("started_at"),
         completed_at=job.get("completed_at"),
-        zip_path=job.get("zip_path"),
         zip_filename=job.get("zip_filename"),
     )
 
 
 @router.get("/{job_id}/zip")
-async def download_zip(job_id: str, background_tasks: BackgroundTasks):
+@router.get("/{job_id}/zip-stream")
+async def download_zip(job_id: UUID, request: Request):
     """
-    Download the ZIP file for a completed job.
+    Download the ZIP archive for a completed job.
+    The archive is streamed from the downloaded files as it is sent, never
+    written to disk. Files are stored uncompressed (ZIP_STORED) since PDFs are
+    already compressed.
+    
+    For "stream" jobs this starts the job: files are fetched and piped into
+    the archive as it is sent, so they never reach the server's disk.
     
     Args:
         job_id: The job ID
-        background_tasks: FastAPI background tasks
+        request: Incoming HTTP request (gives access to the shared HTTP session)
     
     Returns:
-        ZIP file download
+        Streaming ZIP download
     """
-    job = download_service.get_job_status(job_id)
+    job = await download_service.get_job_status_async(job_id)
     
     if not job:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Job '{job_id}' not found",
+        return _job_not_found()
+    
+    if job["download_method"] == "stream":
+        # Claim the job so a second request can't run it again
+        async with download_service.get_job_lock(job_id):
+            if job["status"] != "ready":
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"ZIP stream already started. Current status: {job['status']}",
+                )
+            job["status"] = "collecting_files"
+            job["zip_filename"] = f"{job['qualification']}_{job['job_id'][:8]}.zip"
+        
+        return StreamingResponse(
+            download_service.stream_job_zip(job["job_id"], request.app.state.http),
+            media_type="application/zip",
+            headers={"Content-Disposition": f'attachment; filename="{job["zip_filename"]}"'},
         )
     
     if job["status"] != "completed":
@@ -194,42 +243,39 @@ async def download_zip(job_id: str, background_tasks: BackgroundTasks):
             detail=f"Job is not completed. Current status: {job['status']}",
         )
     
-    zip_path = job.get("zip_path")
-    if not zip_path:
+    # Walks the job directory, so off the event loop
+    zip_stream = await run_in_threadpool(download_service.build_zip_stream, job)
+    if zip_stream is None:
         raise HTTPException(
-            status_code=404,
-            detail="ZIP file not found",
+            status_code=410,
+            detail="The files of this job are no longer available. Please start a new download.",
         )
+    filename = job.get("zip_filename") or f"{job['qualification']}_{job['job_id'][:8]}.zip"
     
-    zip_file_path = PathLib(zip_path)
-    if not zip_file_path.exists():
-        raise HTTPException(
-            status_code=404,
-            detail="ZIP file does not exist",
-        )
-    
-    # Schedule cleanup after download (optional)
-    # background_tasks.add_task(download_service.cleanup_job, job_id)
-    
-    return FileResponse(
-        path=str(zip_file_path),
-        filename=job.get("zip_filename", f"download_{job_id[:8]}.zip"),
+    return StreamingResponse(
+        zip_stream,
         media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Content-Length": str(len(zip_stream)),
+        },
     )
 
 
 @router.post("/direct", response_model=BulkDownloadResponse, status_code=202)
 async def start_direct_download(
     request: BulkDownloadRequest,
-    background_tasks: BackgroundTasks
+    http_request: Request,
 ):
     """
     Start direct file downloads (individual files, no ZIP).
-    Creates a job and processes downloads in background with progress tracking.
+    Creates a job and collects its file URLs in the background. A request
+    that carries the file list of an earlier job with the same selection
+    gets a job that is ready straight away, without scraping the website.
     
     Args:
-        request: Download request with subjects and seasons
-        background_tasks: FastAPI background tasks
+        request: Download request with subjects, seasons and optional files
+        http_request: Incoming HTTP request (gives access to the job queue)
     
     Returns:
         Job ID and initial status
@@ -242,32 +288,38 @@ async def start_direct_download(
         if not request.seasons:
             raise HTTPException(status_code=400, detail="No seasons selected")
         
+        files = [file.model_dump() for file in request.files] if request.files else None
+        
         # Create job for direct downloads
-        job_id = download_service.create_download_job(
+        job_id = await run_in_threadpool(
+            download_service.create_download_job,
             qualification=request.qualification,
             subjects=request.subjects,
             seasons=request.seasons,
-            download_method="direct"
+            download_method="direct",
+            files=files,
         )
         
-        # Start direct downloads in background
-        background_tasks.add_task(
-            download_service.download_direct_files,
-            request.qualification,
-            request.subjects,
-            request.seasons,
-            job_id
-        )
+        if files:
+            return ORJSONResponse({
+                "job_id": str(job_id),
+                "status": "ready",
+                "total_files": len(files),
+                "message": download_service.direct_ready_message(len(files)),
+            }, status_code=202)
         
-        # Get initial job status
-        job = download_service.get_job_status(job_id)
+        # Hand the job to the download workers
+        http_request.app.state.dl_queue.put_nowait(job_id)
         
-        return BulkDownloadResponse(
-            job_id=job_id,
-            status=job["status"],
-            total_files=job["total_files"],
-            message=job["message"],
-        )
+        # The job starts "pending"; the rest of its state is polled via /progress
+        return ORJSONResponse({
+            "job_id": str(job_id),
+            "status": "pending",
+            "total_files": 0,
+            "message": "Initializing download...",
+        }, status_code=202)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -276,7 +328,7 @@ async def start_direct_download(
 
 
 @router.post("/{job_id}/start-direct")
-async def start_direct_downloads(job_id: str):
+async def start_direct_downloads(job_id: UUID):
     """
     Mark direct download job as started.
     
@@ -286,22 +338,21 @@ async def start_direct_downloads(job_id: str):
     Returns:
         Success message
     """
-    job = download_service.get_job_status(job_id)
+    job = await download_service.get_job_status_async(job_id)
     
     if not job:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Job '{job_id}' not found",
-        )
+        return _job_not_found()
     
-    job["status"] = "downloading"
-    job["message"] = "Downloads started in browser..."
+    async with download_service.get_job_lock(job_id):
+        job["status"] = "downloading"
+        job["message"] = "Downloads started in browser..."
+    await download_service.save_job_to_file_async(job_id, job)
     
     return {"message": "Direct downloads started"}
 
 
 @router.delete("/{job_id}")
-async def delete_job(job_id: str):
+async def delete_job(job_id: UUID):
     """
     Delete a job and clean up files.
     
@@ -311,14 +362,12 @@ async def delete_job(job_id: str):
     Returns:
         Success message
     """
-    job = download_service.get_job_status(job_id)
+    job = await download_service.get_job_status_async(job_id)
     
     if not job:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Job '{job_id}' not found",
-        )
+        return _job_not_found()
     
-    download_service.cleanup_job(job_id)
+    # Removes the job directory tree, so off the event loop
+    await run_in_threadpool(download_service.cleanup_job, job_id)
     
     return {"message": f"Job '{job_id}' deleted successfully"}
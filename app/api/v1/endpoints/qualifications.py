@@ -2,13 +2,19 @@
 API endpoints for qualifications.
 """
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
 from typing import List
 
-from app.models.qualification import QualificationResponse, QualificationListResponse
+from app.models.qualification import QualID, QualificationResponse, QualificationListResponse
 from app.services import qualification_service
 
 router = APIRouter()
 
+# Validates a whole list of qualifications in one compiled pass
+_QUAL_ADAPTER = TypeAdapter(List[QualificationResponse])
+
 
 @router.get("/", response_model=QualificationListResponse)
 async def get_qualifications():
@@ -19,21 +25,16 @@ async def get_qualifications():
         List of qualifications with subject counts.
     """
     try:
-        qualifications_data = qualification_service.get_all_qualifications()
+        # Scraping is blocking I/O, keep it off the event loop
+        qualifications_data = await run_in_threadpool(qualification_service.get_all_qualifications)
         
-        qualifications = [
-            QualificationResponse(
-                id=qual["id"],
-                name=qual["name"],
-                subject_count=qual["subject_count"],
-            )
-            for qual in qualifications_data
-        ]
+        qualifications = _QUAL_ADAPTER.validate_python(qualifications_data)
         
-        return QualificationListResponse(
-            qualifications=qualifications,
-            total=len(qualifications),
-        )
+        # Return a ready response so FastAPI doesn't validate the list a second time
+        return ORJSONResponse({
+            "qualifications": _QUAL_ADAPTER.dump_python(qualifications, mode="json"),
+            "total": len(qualifications),
+        })
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -42,7 +43,7 @@ async def get_qualifications():
 
 
 @router.get("/{qualification_id}", response_model=dict)
-async def get_qualification(qualification_id: str):
+async def get_qualification(qualification_id: QualID):
     """
     Get a specific qualification by ID.
     
@@ -52,12 +53,5 @@ async def get_qualification(qualification_id: str):
     Returns:
         Qualification details.
     """
-    qualification = qualification_service.get_qualification_by_id(qualification_id.upper())
-    
-    if not qualification:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Qualification '{qualification_id}' not found",
-        )
-    
-    return qualification
+    # QualID has already validated and normalised the ID
+    return qualification_service.get_qualification_by_id(qualification_id.value)
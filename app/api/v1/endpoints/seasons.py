@@ -1,24 +1,34 @@
 """
 API endpoints for seasons.
 """
-from fastapi import APIRouter, HTTPException, Query, Path
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Path, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+from typing import List, Optional
 
-from app.models.season import SeasonResponse, SeasonListResponse, SeasonDetailResponse
+from app.models.season import SEASON_ID_PATTERN, SeasonResponse, SeasonListResponse, SeasonDetailResponse
+from app.models.subject import SYLLABUS_CODE_PATTERN
+from app.models.qualification import QualID
 from app.services import season_service
 
 router = APIRouter()
 
+# Validates a whole list of seasons in one compiled pass
+_SEASON_ADAPTER = TypeAdapter(List[SeasonResponse])
+
 
 @router.get("/{syllabus_code}/seasons", response_model=SeasonListResponse)
 async def get_seasons(
-    syllabus_code: str = Path(..., description="Syllabus code (e.g., 9700)"),
-    qualification: str = Query(..., description="Qualification ID (AICE, IGCSE, or O)"),
+    request: Request,
+    syllabus_code: str = Path(..., pattern=SYLLABUS_CODE_PATTERN, description="Syllabus code (e.g., 9700)"),
+    qualification: QualID = Query(..., description="Qualification ID (AICE, IGCSE, or O)"),
 ):
     """
     Get all seasons (years) for a specific subject.
     
     Args:
+        request: Incoming HTTP request (gives access to the shared HTTP session)
         syllabus_code: The syllabus code (path parameter)
         qualification: The qualification ID (query parameter)
     
@@ -26,25 +36,20 @@ async def get_seasons(
         List of seasons with metadata (year, name, file_count).
     """
     try:
-        seasons_data = season_service.get_seasons_for_subject(qualification, syllabus_code)
+        # Season pages are scraped concurrently with the shared session
+        seasons_data = await season_service.get_seasons_for_subject_async(
+            qualification.value, syllabus_code, request.app.state.http
+        )
         
-        seasons = [
-            SeasonResponse(
-                id=season["id"],
-                name=season["name"],
-                year=season["year"],
-                url=season["url"],
-                file_count=season["file_count"],
-            )
-            for season in seasons_data
-        ]
+        seasons = _SEASON_ADAPTER.validate_python(seasons_data)
         
-        return SeasonListResponse(
-            seasons=seasons,
-            total=len(seasons),
-            subject_code=syllabus_code,
-            qualification=qualification.upper(),
-        )
+        # Return a ready response so FastAPI doesn't validate the list a second time
+        return ORJSONResponse({
+            "seasons": _SEASON_ADAPTER.dump_python(seasons, mode="json"),
+            "total": len(seasons),
+            "subject_code": syllabus_code,
+            "qualification": qualification.value,
+        })
     except ValueError as e:
         raise HTTPException(
             status_code=404,
@@ -59,9 +64,9 @@ async def get_seasons(
 
 @router.get("/{syllabus_code}/seasons/{season_id}", response_model=SeasonDetailResponse)
 async def get_season(
-    syllabus_code: str = Path(..., description="Syllabus code"),
-    season_id: str = Path(..., description="Season ID (name)"),
-    qualification: str = Query(..., description="Qualification ID"),
+    syllabus_code: str = Path(..., pattern=SYLLABUS_CODE_PATTERN, description="Syllabus code"),
+    season_id: str = Path(..., pattern=SEASON_ID_PATTERN, description="Season ID (name)"),
+    qualification: QualID = Query(..., description="Qualification ID"),
 ):
     """
     Get a specific season by ID.
@@ -75,7 +80,9 @@ async def get_season(
         Season details.
     """
     try:
-        season = season_service.get_season_by_id(qualification, syllabus_code, season_id)
+        season = await run_in_threadpool(
+            season_service.get_season_by_id, qualification.value, syllabus_code, season_id
+        )
         
         if not season:
             raise HTTPException(
@@ -90,7 +97,7 @@ async def get_season(
             url=season["url"],
             file_count=season["file_count"],
             subject_code=syllabus_code,
-            qualification=qualification.upper(),
+            qualification=qualification.value,
         )
     except HTTPException:
         raise
@@ -2,17 +2,24 @@
 API endpoints for subjects.
 """
 from fastapi import APIRouter, HTTPException, Query, Path
-from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+from typing import List, Optional
 
-from app.models.subject import SubjectResponse, SubjectListResponse, SubjectDetailResponse
+from app.models.subject import SYLLABUS_CODE_PATTERN, SubjectResponse, SubjectListResponse, SubjectDetailResponse
+from app.models.qualification import QualID
 from app.services import subject_service
 
 router = APIRouter()
 
+# Validates a whole list of subjects in one compiled pass
+_SUBJ_ADAPTER = TypeAdapter(List[SubjectResponse])
+
 
 @router.get("/", response_model=SubjectListResponse)
 async def get_subjects(
-    qualification: str = Query(..., description="Qualification ID (AICE, IGCSE, or O)"),
+    qualification: QualID = Query(..., description="Qualification ID (AICE, IGCSE, or O)"),
     search: Optional[str] = Query(None, description="Search term to filter subjects"),
 ):
     """
@@ -26,22 +33,19 @@ async def get_subjects(
         List of subjects with codes and names.
     """
     try:
-        subjects_data = subject_service.get_subjects_for_qualification(qualification, search)
+        # Scraping is blocking I/O, keep it off the event loop
+        subjects_data = await run_in_threadpool(
+            subject_service.get_subjects_for_qualification, qualification.value, search
+        )
         
-        subjects = [
-            SubjectResponse(
-                code=subj["code"],
-                name=subj["name"],
-                url=subj["url"],
-            )
-            for subj in subjects_data
-        ]
+        subjects = _SUBJ_ADAPTER.validate_python(subjects_data)
         
-        return SubjectListResponse(
-            subjects=subjects,
-            total=len(subjects),
-            qualification=qualification.upper(),
-        )
+        # Return a ready response so FastAPI doesn't validate the list a second time
+        return ORJSONResponse({
+            "subjects": _SUBJ_ADAPTER.dump_python(subjects, mode="json"),
+            "total": len(subjects),
+            "qualification": qualification.value,
+        })
     except ValueError as e:
         raise HTTPException(
             status_code=404,
@@ -56,8 +60,8 @@ async def get_subjects(
 
 @router.get("/{syllabus_code}", response_model=SubjectDetailResponse)
 async def get_subject(
-    syllabus_code: str = Path(..., description="Syllabus code (e.g., 9700)"),
-    qualification: str = Query(..., description="Qualification ID"),
+    syllabus_code: str = Path(..., pattern=SYLLABUS_CODE_PATTERN, description="Syllabus code (e.g., 9700)"),
+    qualification: QualID = Query(..., description="Qualification ID"),
 ):
     """
     Get a specific subject by syllabus code.
@@ -70,19 +74,21 @@ async def get_subject(
         Subject details.
     """
     try:
-        subject = subject_service.get_subject_by_code(qualification, syllabus_code)
+        subject = await run_in_threadpool(
+            subject_service.get_subject_by_code, qualification.value, syllabus_code
+        )
         
         if not subject:
             raise HTTPException(
                 status_code=404,
-                detail=f"Subject '{syllabus_code}' not found in qualification '{qualification}'",
+                detail=f"Subject '{syllabus_code}' not found in qualification '{qualification.value}'",
             )
         
         return SubjectDetailResponse(
             code=subject["code"],
             name=subject["name"],
             url=subject["url"],
-            qualification=qualification.upper(),
+            qualification=qualification.value,
         )
     except HTTPException:
         raise
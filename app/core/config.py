@@ -17,6 +17,9 @@ class Settings:
     # Server
     HOST: str = os.getenv("HOST", "0.0.0.0")
     PORT: int = int(os.getenv("PORT", "8000"))
+    # uvicorn worker processes when run via `python -m app.main` (ignored in DEBUG/reload mode).
+    # More than one needs a shared job store (JOB_STORE_BACKEND file or redis).
+    WEB_WORKERS: int = int(os.getenv("WEB_WORKERS", "1"))
     
     # Directories
     BASE_DIR: Path = Path(__file__).parent.parent.parent
@@ -27,9 +30,34 @@ class Settings:
     OUTPUT_DIR: Path = BASE_DIR / "output"
     
     # Download Settings
-    MAX_CONCURRENT_DOWNLOADS: int = int(os.getenv("MAX_CONCURRENT_DOWNLOADS", "15"))
+    MAX_CONCURRENT_DOWNLOADS: int = int(os.getenv("MAX_CONCURRENT_DOWNLOADS", "32"))
+    # Open connections to any one host; nearly every file comes from one host,
+    # so this (not MAX_CONCURRENT_DOWNLOADS) is what really throttles downloads
+    MAX_CONNECTIONS_PER_HOST: int = int(os.getenv("MAX_CONNECTIONS_PER_HOST", str(min(20, MAX_CONCURRENT_DOWNLOADS))))
     DOWNLOAD_TIMEOUT: int = int(os.getenv("DOWNLOAD_TIMEOUT", "30"))
     CLEANUP_TTL_HOURS: int = int(os.getenv("CLEANUP_TTL_HOURS", "1"))
+
+    # Number of background workers consuming the download job queue
+    DOWNLOAD_WORKERS: int = int(os.getenv("DOWNLOAD_WORKERS", str(max(1, MAX_CONCURRENT_DOWNLOADS // 5))))
+    
+    # Maximum entries in each scrape cache (qualifications, subjects, seasons, file counts)
+    CACHE_MAX: int = int(os.getenv("CACHE_MAX", "1024"))
+    
+    # Redis URL for a scrape cache shared by all workers (e.g. redis://localhost:6379/0)
+    REDIS_URL: Optional[str] = os.getenv("REDIS_URL")
+    
+    # Where download jobs are saved: "file" (TEMP_DOWNLOAD_DIR/jobs), "redis" (REDIS_URL)
+    # or "memory" (not saved; jobs are lost on restart)
+    JOB_STORE_BACKEND: str = os.getenv("JOB_STORE_BACKEND", "file").lower()
+    
+    # SQLite snapshot of the scrape cache, used when REDIS_URL isn't set (empty disables it)
+    CACHE_DB: str = os.getenv("CACHE_DB", str(TEMP_DOWNLOAD_DIR / "cache.sqlite3"))
+    
+    # Bearer token required by the /admin endpoints (unset: they aren't mounted)
+    ADMIN_TOKEN: Optional[str] = os.getenv("ADMIN_TOKEN") or None
+    
+    # Sent with every request to PapaCambridge (scrapes and downloads)
+    USER_AGENT: str = f"{APP_NAME}/{APP_VERSION}"
     
     # PapaCambridge URLs
     PAPACAMBRIDGE_BASE_URL: str = "https://pastpapers.papacambridge.com"
@@ -43,15 +71,5 @@ class Settings:
 
 
 # Global settings instance
+# (directories are created on first use by the download service, not at import)
 settings = Settings()
-
-# Create necessary directories
-try:
-    settings.TEMP_DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
-except (PermissionError, OSError):
-    pass
-
-try:
-    settings.OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-except (PermissionError, OSError):
-    pass
@@ -3,6 +3,7 @@ Custom exception handlers for the application.
 """
 from fastapi import Request, status
 from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from fastapi import HTTPException
 
@@ -31,7 +32,8 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     """Handle validation errors."""
     return JSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-        content={"detail": exc.errors(), "body": exc.body},
+        # Errors from validators carry the exception itself (not JSON)
+        content=jsonable_encoder({"detail": exc.errors(), "body": exc.body}),
     )
 
 
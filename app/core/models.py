@@ -1,14 +1,16 @@
 """
 Data models for web scraping.
 """
+from typing import Dict, NamedTuple
 
 
-class LinkClass:
+class LinkClass(NamedTuple):
     """Class for associating file name with URL."""
     
-    def __init__(self, name: str, url: str):
-        self.name = name
-        self.url = url
+    # A NamedTuple: scrapes build thousands of these, and a tuple is the
+    # smallest object that holds them (no per-instance __dict__)
+    name: str
+    url: str
     
     def getAttr(self):
         """Get attributes as tuple."""
@@ -16,3 +18,27 @@ class LinkClass:
     
     def __repr__(self):
         return f"{self.name} - {self.url}"
+
+
+class FileInfo(NamedTuple):
+    """An exam file collected for a download job."""
+    
+    url: str
+    filename: str
+    subject: str
+    subject_code: str
+    season: str
+    season_id: str
+    # Where a bulk download saves the file (unset for direct/stream jobs)
+    filepath: str = ""
+    
+    def to_dict(self) -> Dict[str, str]:
+        """Get the file's details (without its local path) as a dictionary."""
+        return {
+            "url": self.url,
+            "filename": self.filename,
+            "subject": self.subject,
+            "subject_code": self.subject_code,
+            "season": self.season,
+            "season_id": self.season_id,
+        }
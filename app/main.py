@@ -1,13 +1,14 @@
 """
 FastAPI application entry point.
 """
+import asyncio
 import logging
 import sys
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 
 from app.core.config import settings
 from app.core.exceptions import (
@@ -20,6 +21,7 @@ from fastapi import HTTPException
 
 # Import API routers
 from app.api.v1.api import api_router
+from app.services import cache_service, download_service
 
 # Configure logging
 logging.basicConfig(
@@ -43,6 +45,7 @@ app = FastAPI(
     description="Past Papers Downloader - Web UI for downloading CAIE past papers",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -73,6 +76,30 @@ if static_dir.exists():
 templates = Jinja2Templates(directory=str(templates_dir))
 
 
+@app.on_event("startup")
+async def start_download_workers():
+    """Create the shared HTTP session and the download job queue, and spawn its workers."""
+    app.state.http = download_service.get_http_session()
+    app.state.dl_queue = asyncio.Queue()
+    app.state.dl_workers = [
+        asyncio.create_task(download_service.job_worker(app.state.dl_queue, app.state.http))
+        for _ in range(settings.DOWNLOAD_WORKERS)
+    ]
+    logger.info(f"Started {settings.DOWNLOAD_WORKERS} download workers")
+    app.state.cache_flusher = asyncio.create_task(cache_service.run_invalidation_flusher())
+
+
+@app.on_event("shutdown")
+async def stop_download_workers():
+    """Cancel the download workers, close the shared HTTP session and flush cache invalidations."""
+    for worker in app.state.dl_workers:
+        worker.cancel()
+    app.state.cache_flusher.cancel()
+    await asyncio.gather(*app.state.dl_workers, app.state.cache_flusher, return_exceptions=True)
+    await download_service.close_http_session()
+    cache_service.flush_invalidations()
+
+
 @app.get("/", response_class=HTMLResponse)
 async def root(request: Request):
     """Landing page."""
@@ -113,9 +140,16 @@ app.include_router(api_router, prefix="/api/v1")
 
 if __name__ == "__main__":
     import uvicorn
+    workers = settings.WEB_WORKERS
+    if workers > 1 and settings.JOB_STORE_BACKEND == "memory":
+        # Jobs would only exist in the worker that created them
+        logging.warning("JOB_STORE_BACKEND=memory only supports one worker; ignoring WEB_WORKERS")
+        workers = 1
     uvicorn.run(
         "app.main:app",
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.DEBUG,
+        # reload and multiple workers are mutually exclusive
+        workers=None if settings.DEBUG else workers,
     )
@@ -1,8 +1,42 @@
 """
 Pydantic models for bulk downloads.
 """
-from pydantic import BaseModel
-from typing import List, Optional, Dict
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional, Dict, TypedDict
+from urllib.parse import urlsplit
+
+from app.core.config import settings
+
+# Most files a direct download request may carry
+MAX_DIRECT_FILES = 5000
+
+_FILE_HOST = urlsplit(settings.PAPACAMBRIDGE_BASE_URL).hostname
+
+
+class DirectFile(BaseModel):
+    """A file of an earlier direct download (an entry of its direct_download_urls)."""
+    url: str
+    filename: str = Field(min_length=1, max_length=255)
+    subject: str = ""
+    subject_code: str = ""
+    season: str = ""
+    season_id: str = ""
+    
+    @field_validator("url")
+    @classmethod
+    def _check_url(cls, url: str) -> str:
+        # Only files from the site we scrape, so the list can't point browsers elsewhere
+        parts = urlsplit(url)
+        if parts.scheme != "https" or parts.hostname != _FILE_HOST:
+            raise ValueError(f"must be an https URL on {_FILE_HOST}")
+        return url
+    
+    @field_validator("filename")
+    @classmethod
+    def _check_filename(cls, filename: str) -> str:
+        if "/" in filename or "\\" in filename or filename in (".", ".."):
+            raise ValueError("must be a plain file name")
+        return filename
 
 
 class BulkDownloadRequest(BaseModel):
@@ -11,6 +45,9 @@ class BulkDownloadRequest(BaseModel):
     subjects: List[str]
     seasons: List[str]  # Format: "subjectCode:seasonId"
     download_method: Optional[str] = "zip"  # "zip" or "direct"
+    # /direct only: the file list of an earlier job with the same selection,
+    # so the website isn't scraped again
+    files: Optional[List[DirectFile]] = Field(default=None, max_length=MAX_DIRECT_FILES)
 
 
 class BulkDownloadResponse(BaseModel):
@@ -21,20 +58,25 @@ class BulkDownloadResponse(BaseModel):
     message: str
 
 
-class DownloadProgress(BaseModel):
-    """Progress model for download status."""
+class DownloadProgress(TypedDict, total=False):
+    """
+    Progress of a download job, as returned by /progress.
+    A TypedDict rather than a model: it is built on every poll and serialised
+    straight to JSON, so it never needs validating.
+    """
     job_id: str
     status: str
     current_file: int
     total_files: int
     percentage: float
     message: str
-    downloaded_files: List[str]
-    failed_files: List[Dict]
+    downloaded_count: int
+    failed_count: int
+    downloaded_files: List[str]  # most recent only
+    failed_files: List[Dict]  # most recent only
     errors: List[str]
-    zip_path: Optional[str] = None
-    zip_filename: Optional[str] = None
-    direct_download_urls: Optional[List[Dict]] = None
+    zip_filename: Optional[str]
+    direct_download_urls: List[Dict]
 
 
 class JobStatus(BaseModel):
@@ -48,11 +90,12 @@ class JobStatus(BaseModel):
     total_files: int
     percentage: float
     message: str
-    downloaded_files: List[str]
-    failed_files: List[Dict]
+    downloaded_count: int
+    failed_count: int
+    downloaded_files: List[str]  # most recent only
+    failed_files: List[Dict]  # most recent only
     errors: List[str]
     created_at: str
     started_at: Optional[str] = None
     completed_at: Optional[str] = None
-    zip_path: Optional[str] = None
     zip_filename: Optional[str] = None
@@ -1,10 +1,25 @@
 """
 Pydantic models for qualifications.
 """
-from pydantic import BaseModel
+from enum import Enum
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
 
 
+class QualID(str, Enum):
+    """Supported qualification IDs."""
+    AICE = "AICE"
+    IGCSE = "IGCSE"
+    O = "O"
+    
+    @classmethod
+    def _missing_(cls, value):
+        # Accept IDs in any case (e.g. "igcse")
+        if isinstance(value, str):
+            return cls._value2member_map_.get(value.upper())
+        return None
+
+
 class QualificationBase(BaseModel):
     """Base qualification model."""
     id: str
@@ -15,8 +30,7 @@ class QualificationResponse(QualificationBase):
     """Qualification response model."""
     subject_count: int
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class QualificationListResponse(BaseModel):
@@ -1,10 +1,14 @@
 """
 Pydantic models for seasons.
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
 
 
+# Season IDs are scraped names such as "2023-May-June" or "2023 Oct Nov"
+SEASON_ID_PATTERN = r"^[A-Za-z0-9 _-]+$"
+
+
 class SeasonBase(BaseModel):
     """Base season model."""
     id: str
@@ -17,8 +21,7 @@ class SeasonBase(BaseModel):
 class SeasonResponse(SeasonBase):
     """Season response model."""
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class SeasonListResponse(BaseModel):
@@ -34,5 +37,4 @@ class SeasonDetailResponse(SeasonBase):
     subject_code: str
     qualification: str
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
@@ -1,10 +1,14 @@
 """
 Pydantic models for subjects.
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
 
 
+# Syllabus codes are numeric (usually 4 digits, e.g. "9700")
+SYLLABUS_CODE_PATTERN = r"^\d+$"
+
+
 class SubjectBase(BaseModel):
     """Base subject model."""
     code: str
@@ -15,8 +19,7 @@ class SubjectBase(BaseModel):
 class SubjectResponse(SubjectBase):
     """Subject response model."""
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class SubjectListResponse(BaseModel):
@@ -30,5 +33,4 @@ class SubjectDetailResponse(SubjectBase):
     """Subject detail response."""
     qualification: str
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
@@ -2,25 +2,291 @@
 Caching service for PapaCambridge data.
 Reduces repeated scraping by caching seasons and file counts.
 """
-from typing import Dict, Optional, List
-from datetime import datetime, timedelta
-import json
+from typing import Any, Dict, Iterable, Optional, List, Set
 from pathlib import Path
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+
+import aiohttp
+import orjson
+from cachetools import TTLCache
+from fastapi.concurrency import run_in_threadpool
 
 from app.core.config import settings
+from app.core.models import LinkClass
+from app.services import web_scraper
+
+logger = logging.getLogger(__name__)
+
+
+# Cache lifetimes in seconds
+CACHE_TTL = 3600  # 1 hour
+FILE_COUNT_CACHE_TTL = 24 * 3600  # 24 hours - file counts change rarely
+
+# How long a failed subject/season lookup is remembered
+MISS_CACHE_TTL = 300  # 5 minutes
+
+# Seconds between flushes of pending second-level invalidations
+INVALIDATION_FLUSH_INTERVAL = 60
+
+class _IndexedList(list):
+    """
+    A cached list that carries a {item[field]: item} lookup index, built on
+    first use. The index lives in the list's own cache entry, so the two
+    always expire and are replaced together. In-memory only: the
+    second-level cache stores the plain list.
+    """
+    __slots__ = ("_field", "_lookup")
+    
+    def __init__(self, items: Iterable[dict], field: str):
+        super().__init__(items)
+        self._field = field
+        self._lookup: Optional[Dict[Any, dict]] = None
+    
+    def lookup(self) -> Dict[Any, dict]:
+        """Get the index (the first item wins on duplicates)."""
+        if self._lookup is None:
+            lookup = {}
+            for item in self:
+                lookup.setdefault(item[self._field], item)
+            self._lookup = lookup
+        return self._lookup
+
+
+class _IndexedCache(TTLCache):
+    """TTLCache that stores lists as _IndexedList, indexed by `field`."""
+    
+    def __init__(self, maxsize: int, ttl: float, field: str):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.field = field
+    
+    def __setitem__(self, key, value):
+        super().__setitem__(key, _IndexedList(value, self.field))
+
+
+# In-memory caches. TTLCache expires entries lazily on access and evicts the
+# oldest entry once maxsize is reached, so they never need sweeping.
+_seasons_cache: TTLCache = _IndexedCache(maxsize=settings.CACHE_MAX, ttl=CACHE_TTL, field="id")  # {cache_key: seasons}
+_file_count_cache: TTLCache = TTLCache(maxsize=settings.CACHE_MAX, ttl=FILE_COUNT_CACHE_TTL)  # {url: count}
+_subjects_cache: TTLCache = _IndexedCache(maxsize=settings.CACHE_MAX, ttl=CACHE_TTL, field="code")  # {qualification_id: subjects}
+_qualifications_cache: TTLCache = TTLCache(maxsize=1, ttl=CACHE_TTL)  # {"all": qualifications}
+_exams_cache: TTLCache = TTLCache(maxsize=settings.CACHE_MAX, ttl=CACHE_TTL)  # {url: [(name, url)]}
+
+# Negative cache of lookups that found nothing, so a bad code retried across
+# jobs isn't looked up every time. In-memory only: misses are cheap to redo.
+_misses_cache: TTLCache = TTLCache(maxsize=2048, ttl=MISS_CACHE_TTL)  # {lookup_key: True}
+
+# TTLCache isn't thread-safe, and services run in FastAPI's thread pool
+_lock = threading.RLock()
+
+# Second-level cache behind the in-memory ones, so hits never leave the
+# process but misses can avoid a scrape:
+# - Redis (REDIS_URL), shared by all worker processes
+# - otherwise a SQLite snapshot (CACHE_DB), so restarts start warm
+_REDIS_PREFIX = "pp:cache:"
+_redis = None
+if settings.REDIS_URL:
+    import redis
+    _redis = redis.Redis.from_url(settings.REDIS_URL)
+
+# Second-level keys found stale, deleted together by flush_invalidations()
+# (the in-memory entries are dropped straight away)
+_pending_invalidations: Set[str] = set()
+
+# SQLite connection, opened on first use (None if disabled or unavailable)
+_db: Optional[sqlite3.Connection] = None
+_db_opened = False
+
+
+def _get_db() -> Optional[sqlite3.Connection]:
+    """Open the SQLite cache snapshot on first use. Call with _lock held."""
+    global _db, _db_opened
+    if _db_opened:
+        return _db
+    _db_opened = True
+    
+    if not settings.CACHE_DB:
+        return None
+    try:
+        Path(settings.CACHE_DB).parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(settings.CACHE_DB, isolation_level=None, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("CREATE TABLE IF NOT EXISTS kv(k TEXT PRIMARY KEY, v BLOB, exp REAL)")
+        _db = db
+    except (sqlite3.Error, OSError) as e:
+        # e.g. read-only filesystem on serverless hosts
+        logger.warning(f"SQLite cache disabled: {e}")
+    return _db
+
+
+def _l2_get(key: str) -> Optional[bytes]:
+    """Read a serialised value from the second-level cache."""
+    if _redis is not None:
+        try:
+            return _redis.get(_REDIS_PREFIX + key)
+        except redis.RedisError as e:
+            logger.warning(f"Redis cache read failed: {e}")
+            return None
+    
+    with _lock:
+        db = _get_db()
+        if db is None:
+            return None
+        try:
+            row = db.execute("SELECT v FROM kv WHERE k=? AND exp>?", (key, time.time())).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"SQLite cache read failed: {e}")
+            return None
+    return row[0] if row else None
+
+
+def _l2_set(key: str, raw: bytes, ttl: int):
+    """Write a serialised value to the second-level cache."""
+    if _redis is not None:
+        try:
+            _redis.set(_REDIS_PREFIX + key, raw, ex=ttl)
+        except redis.RedisError as e:
+            logger.warning(f"Redis cache write failed: {e}")
+        return
+    
+    with _lock:
+        db = _get_db()
+        if db is None:
+            return
+        try:
+            db.execute("INSERT OR REPLACE INTO kv VALUES (?, ?, ?)", (key, raw, time.time() + ttl))
+        except sqlite3.Error as e:
+            logger.warning(f"SQLite cache write failed: {e}")
+
+
+def _l2_delete(keys: List[str]):
+    """Remove keys from the second-level cache."""
+    if _redis is not None:
+        try:
+            _redis.delete(*(_REDIS_PREFIX + key for key in keys))
+        except redis.RedisError as e:
+            logger.warning(f"Redis cache delete failed: {e}")
+        return
+    
+    with _lock:
+        db = _get_db()
+        if db is None:
+            return
+        try:
+            db.executemany("DELETE FROM kv WHERE k=?", [(key,) for key in keys])
+        except sqlite3.Error as e:
+            logger.warning(f"SQLite cache delete failed: {e}")
+
+
+def _l2_clear():
+    """Remove everything from the second-level cache."""
+    if _redis is not None:
+        try:
+            keys = list(_redis.scan_iter(match=f"{_REDIS_PREFIX}*"))
+            if keys:
+                _redis.delete(*keys)
+        except redis.RedisError as e:
+            logger.warning(f"Redis cache clear failed: {e}")
+        return
+    
+    with _lock:
+        db = _get_db()
+        if db is None:
+            return
+        try:
+            db.execute("DELETE FROM kv")
+        except sqlite3.Error as e:
+            logger.warning(f"SQLite cache clear failed: {e}")
+
+
+def _cache_get(cache: TTLCache, namespace: str, key: str) -> Any:
+    """
+    Look a key up in an in-memory cache, then in the second-level cache.
+    A second-level hit is copied into the in-memory cache.
+    
+    Args:
+        cache: In-memory cache
+        namespace: Second-level key namespace for this cache
+        key: Cache key
+    
+    Returns:
+        Cached value or None
+    """
+    l2_key = f"{namespace}:{key}"
+    with _lock:
+        value = cache.get(key)
+        # Don't reload a stale value that hasn't been flushed yet
+        stale = l2_key in _pending_invalidations
+    if value is not None or stale:
+        return value
+    
+    raw = _l2_get(l2_key)
+    if raw is None:
+        return None
+    
+    value = orjson.loads(raw)
+    with _lock:
+        cache[key] = value
+        # Return what the cache stored, which may wrap the value (_IndexedCache)
+        return cache.get(key, value)
+
+
+def _cache_set(cache: TTLCache, namespace: str, key: str, value: Any):
+    """
+    Store a value in an in-memory cache and the second-level cache (same TTL).
+    
+    Args:
+        cache: In-memory cache
+        namespace: Second-level key namespace for this cache
+        key: Cache key
+        value: JSON-serialisable value
+    """
+    l2_key = f"{namespace}:{key}"
+    with _lock:
+        cache[key] = value
+        _pending_invalidations.discard(l2_key)
+    _l2_set(l2_key, orjson.dumps(value), int(cache.ttl))
+
+
+def _cache_invalidate(cache: TTLCache, namespace: str, key: str):
+    """
+    Drop a stale key from an in-memory cache now, and queue its removal from
+    the second-level cache for the next flush_invalidations().
+    
+    Args:
+        cache: In-memory cache
+        namespace: Second-level key namespace for this cache
+        key: Cache key
+    """
+    with _lock:
+        cache.pop(key, None)
+        _pending_invalidations.add(f"{namespace}:{key}")
+
+
+def flush_invalidations():
+    """Delete every queued stale key from the second-level cache in one batch."""
+    global _pending_invalidations
+    with _lock:
+        if not _pending_invalidations:
+            return
+        keys, _pending_invalidations = list(_pending_invalidations), set()
+    
+    _l2_delete(keys)
 
 
-# In-memory cache
-_seasons_cache: Dict[str, Dict] = {}  # {cache_key: {data, expires_at}}
-_file_count_cache: Dict[str, Dict] = {}  # {url: {count, expires_at}}
-_subjects_cache: Dict[str, Dict] = {}  # {qualification_id: {data, expires_at}}
-_qualifications_cache: Optional[Dict] = None  # Cached qualifications list
-_qualifications_cache_expires: Optional[datetime] = None
+async def run_invalidation_flusher():
+    """Flush queued invalidations every INVALIDATION_FLUSH_INTERVAL seconds, until cancelled."""
+    while True:
+        await asyncio.sleep(INVALIDATION_FLUSH_INTERVAL)
+        await run_in_threadpool(flush_invalidations)
 
 
 def get_cache_key(qualification: str, subject_code: str) -> str:
-    """Generate cache key for seasons."""
-    return f"{qualification}:{subject_code}"
+    """Generate cache key for seasons (qualification upper-cased, like the subjects cache)."""
+    return f"{qualification.upper()}:{subject_code}"
 
 
 def get_seasons_cached(qualification: str, subject_code: str) -> Optional[List[dict]]:
@@ -34,37 +300,34 @@ def get_seasons_cached(qualification: str, subject_code: str) -> Optional[List[d
     Returns:
         Cached seasons list or None if not cached/expired
     """
-    cache_key = get_cache_key(qualification, subject_code)
-    
-    if cache_key in _seasons_cache:
-        cache_entry = _seasons_cache[cache_key]
-        
-        # Check if expired (cache for 1 hour)
-        if datetime.now() < cache_entry["expires_at"]:
-            return cache_entry["data"]
-        else:
-            # Remove expired entry
-            del _seasons_cache[cache_key]
-    
-    return None
+    return _cache_get(_seasons_cache, "seasons", get_cache_key(qualification, subject_code))
 
 
-def set_seasons_cache(qualification: str, subject_code: str, seasons: List[dict], ttl_hours: int = 1):
+def set_seasons_cache(qualification: str, subject_code: str, seasons: List[dict]):
     """
-    Cache seasons data.
+    Cache seasons data (for CACHE_TTL).
     
     Args:
         qualification: Qualification ID
         subject_code: Subject code
         seasons: Seasons data to cache
-        ttl_hours: Time to live in hours (default: 1 hour)
     """
-    cache_key = get_cache_key(qualification, subject_code)
+    _cache_set(_seasons_cache, "seasons", get_cache_key(qualification, subject_code), seasons)
+
+
+def get_seasons_index_cached(qualification: str, subject_code: str) -> Optional[dict]:
+    """
+    Get cached seasons of a subject keyed by season ID.
+    
+    Args:
+        qualification: Qualification ID
+        subject_code: Subject code
     
-    _seasons_cache[cache_key] = {
-        "data": seasons,
-        "expires_at": datetime.now() + timedelta(hours=ttl_hours),
-    }
+    Returns:
+        {season_id: season} or None if the seasons aren't cached
+    """
+    seasons = get_seasons_cached(qualification, subject_code)
+    return seasons.lookup() if seasons is not None else None
 
 
 def get_file_count_cached(season_url: str) -> Optional[int]:
@@ -77,38 +340,36 @@ def get_file_count_cached(season_url: str) -> Optional[int]:
     Returns:
         Cached file count or None if not cached/expired
     """
-    if season_url in _file_count_cache:
-        cache_entry = _file_count_cache[season_url]
-        
-        # Check if expired (cache for 24 hours - file counts change rarely)
-        if datetime.now() < cache_entry["expires_at"]:
-            return cache_entry["count"]
-        else:
-            # Remove expired entry
-            del _file_count_cache[season_url]
-    
-    return None
+    return _cache_get(_file_count_cache, "file_count", season_url)
 
 
-def set_file_count_cache(season_url: str, count: int, ttl_hours: int = 24):
+def set_file_count_cache(season_url: str, count: int):
     """
-    Cache file count.
+    Cache file count (for FILE_COUNT_CACHE_TTL).
     
     Args:
         season_url: Season URL
         count: File count to cache
-        ttl_hours: Time to live in hours (default: 24 hours)
     """
-    _file_count_cache[season_url] = {
-        "count": count,
-        "expires_at": datetime.now() + timedelta(hours=ttl_hours),
-    }
+    _cache_set(_file_count_cache, "file_count", season_url, count)
 
 
 def clear_cache():
-    """Clear all cached data."""
-    _seasons_cache.clear()
-    _file_count_cache.clear()
+    """
+    Clear all cached data.
+    Other workers keep their in-memory copies until they expire.
+    """
+    with _lock:
+        _seasons_cache.clear()
+        _file_count_cache.clear()
+        _subjects_cache.clear()
+        _qualifications_cache.clear()
+        _exams_cache.clear()
+        _misses_cache.clear()
+        _pending_invalidations.clear()
+    
+    web_scraper.clear_page_cache()
+    _l2_clear()
 
 
 def get_subjects_cached(qualification_id: str) -> Optional[List[dict]]:
@@ -121,32 +382,32 @@ def get_subjects_cached(qualification_id: str) -> Optional[List[dict]]:
     Returns:
         Cached subjects list or None if not cached/expired
     """
-    if qualification_id in _subjects_cache:
-        cache_entry = _subjects_cache[qualification_id]
-        
-        # Check if expired (cache for 1 hour)
-        if datetime.now() < cache_entry["expires_at"]:
-            return cache_entry["data"]
-        else:
-            # Remove expired entry
-            del _subjects_cache[qualification_id]
-    
-    return None
+    return _cache_get(_subjects_cache, "subjects", qualification_id)
 
 
-def set_subjects_cache(qualification_id: str, subjects: List[dict], ttl_hours: int = 1):
+def set_subjects_cache(qualification_id: str, subjects: List[dict]):
     """
-    Cache subjects data.
+    Cache subjects data (for CACHE_TTL).
     
     Args:
         qualification_id: Qualification ID
         subjects: Subjects data to cache
-        ttl_hours: Time to live in hours (default: 1 hour)
     """
-    _subjects_cache[qualification_id] = {
-        "data": subjects,
-        "expires_at": datetime.now() + timedelta(hours=ttl_hours),
-    }
+    _cache_set(_subjects_cache, "subjects", qualification_id, subjects)
+
+
+def get_subjects_index_cached(qualification_id: str) -> Optional[dict]:
+    """
+    Get cached subjects of a qualification keyed by syllabus code.
+    
+    Args:
+        qualification_id: Qualification ID
+    
+    Returns:
+        {code: subject} or None if the subjects aren't cached
+    """
+    subjects = get_subjects_cached(qualification_id)
+    return subjects.lookup() if subjects is not None else None
 
 
 def get_qualifications_cached() -> Optional[List[dict]]:
@@ -156,60 +417,99 @@ def get_qualifications_cached() -> Optional[List[dict]]:
     Returns:
         Cached qualifications list or None if not cached/expired
     """
-    global _qualifications_cache, _qualifications_cache_expires
+    return _cache_get(_qualifications_cache, "qualifications", "all")
+
+
+def set_qualifications_cache(qualifications: List[dict]):
+    """
+    Cache qualifications data (for CACHE_TTL).
+    
+    Args:
+        qualifications: Qualifications data to cache
+    """
+    _cache_set(_qualifications_cache, "qualifications", "all", qualifications)
+
+
+def is_miss_cached(lookup_key: str) -> bool:
+    """
+    Check whether a lookup recently found nothing.
     
-    if _qualifications_cache is not None and _qualifications_cache_expires is not None:
-        # Check if expired (cache for 1 hour)
-        if datetime.now() < _qualifications_cache_expires:
-            return _qualifications_cache
+    Args:
+        lookup_key: Key identifying the lookup (e.g. "subject:AICE:9999")
     
-    return None
+    Returns:
+        True if the lookup missed within the last MISS_CACHE_TTL
+    """
+    with _lock:
+        return lookup_key in _misses_cache
 
 
-def set_qualifications_cache(qualifications: List[dict], ttl_hours: int = 1):
+def set_miss_cache(lookup_key: str):
     """
-    Cache qualifications data.
+    Remember that a lookup found nothing (for MISS_CACHE_TTL).
     
     Args:
-        qualifications: Qualifications data to cache
-        ttl_hours: Time to live in hours (default: 1 hour)
-    """
-    global _qualifications_cache, _qualifications_cache_expires
-    
-    _qualifications_cache = qualifications
-    _qualifications_cache_expires = datetime.now() + timedelta(hours=ttl_hours)
-
-
-def clear_expired_cache():
-    """Remove expired cache entries."""
-    now = datetime.now()
-    
-    # Clear expired seasons cache
-    expired_keys = [
-        key for key, entry in _seasons_cache.items()
-        if now >= entry["expires_at"]
-    ]
-    for key in expired_keys:
-        del _seasons_cache[key]
-    
-    # Clear expired file count cache
-    expired_urls = [
-        url for url, entry in _file_count_cache.items()
-        if now >= entry["expires_at"]
-    ]
-    for url in expired_urls:
-        del _file_count_cache[url]
-    
-    # Clear expired subjects cache
-    expired_subjects = [
-        qual_id for qual_id, entry in _subjects_cache.items()
-        if now >= entry["expires_at"]
-    ]
-    for qual_id in expired_subjects:
-        del _subjects_cache[qual_id]
-    
-    # Clear expired qualifications cache
-    global _qualifications_cache, _qualifications_cache_expires
-    if _qualifications_cache_expires and now >= _qualifications_cache_expires:
-        _qualifications_cache = None
-        _qualifications_cache_expires = None
\ No newline at end of file
+        lookup_key: Key identifying the lookup
+    """
+    with _lock:
+        _misses_cache[lookup_key] = True
+
+
+def get_exams_cached(season_url: str) -> List[LinkClass]:
+    """
+    Get the exam files of a season, scraping the page only on a cache miss.
+    Shared by season file counts and every download job, so a season page is
+    fetched once per CACHE_TTL however many jobs include it.
+    
+    Args:
+        season_url: Season URL
+    
+    Returns:
+        List of LinkClass objects
+    """
+    exams = _get_exams_from_cache(season_url)
+    if exams is None:
+        exams = web_scraper.get_exams(season_url)
+        _set_exams_cache(season_url, exams)
+    return exams
+
+
+async def get_exams_cached_async(season_url: str, session: aiohttp.ClientSession) -> List[LinkClass]:
+    """
+    Like get_exams_cached, but a miss is scraped with the given aiohttp
+    session, so download jobs reuse their pooled connections. Cache reads and
+    writes (which may touch Redis/SQLite) run in the thread pool.
+    
+    Args:
+        season_url: Season URL
+        session: aiohttp session to fetch the page with
+    
+    Returns:
+        List of LinkClass objects
+    """
+    exams = await run_in_threadpool(_get_exams_from_cache, season_url)
+    if exams is None:
+        exams = await web_scraper.get_exams_async(session, season_url)
+        await run_in_threadpool(_set_exams_cache, season_url, exams)
+    return exams
+
+
+def _get_exams_from_cache(season_url: str) -> Optional[List[LinkClass]]:
+    """Get a season's cached exam files, or None if not cached."""
+    pairs = _cache_get(_exams_cache, "exams", season_url)
+    if pairs is None:
+        return None
+    return [LinkClass(name, url) for name, url in pairs]
+
+
+def _set_exams_cache(season_url: str, exams: List[LinkClass]):
+    """Cache a season's freshly scraped exam files."""
+    # An empty page is more likely a failed fetch than an empty season
+    if exams:
+        _cache_set(_exams_cache, "exams", season_url, [exam.getAttr() for exam in exams])
+        
+        # The season's file count outlives its exam list; drop it if the
+        # files changed, rather than serving the old count for up to a day
+        count = _cache_get(_file_count_cache, "file_count", season_url)
+        if count is not None and count != len(exams):
+            _cache_invalidate(_file_count_cache, "file_count", season_url)
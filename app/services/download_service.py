@@ -3,76 +3,845 @@ Service for bulk downloading past papers.
 """
 import asyncio
 import aiohttp
+import aiofiles
 from pathlib import Path
-from typing import List, Dict, Optional
-import zipfile
+from typing import AsyncIterator, Hashable, Iterator, List, Dict, Optional, Set, Tuple, Union
 import shutil
+import zipfile
+import collections
+import itertools
+import tempfile
+import threading
+from zipstream import ZipStream, ZIP_STORED
+from cachetools import Cache, TTLCache
 from datetime import datetime
 import uuid
-import json
 import os
+import queue
+import random
+import time
+import zlib
+import orjson
+from fastapi.concurrency import run_in_threadpool
 
-from app.services import web_scraper, subject_service, season_service
+from app.services import cache_service, subject_service, season_service
+from app.services.job_store import create_job_store
 from app.core.config import settings
+from app.core.exceptions import DownloadError
+from app.models.download import DownloadProgress
+from app.core.models import FileInfo
+
+
+# Bounds of the in-memory job registry; older jobs are still read back from
+# their job file on demand
+JOB_REGISTRY_MAX = 10_000
+JOB_REGISTRY_TTL = 24 * 3600
+
+# Seconds between sweeps of expired jobs out of the registry
+JOB_EXPIRE_INTERVAL = 60
+
+# Per-job locks guarding mutations made outside the job's worker
+job_locks: Dict[uuid.UUID, asyncio.Lock] = {}
+
+# Per-job events set whenever the job changes (wakes progress streams)
+job_events: Dict[uuid.UUID, asyncio.Event] = {}
+
+# Serialised progress per job, dropped on every change and rebuilt on next read
+_progress_blobs: Dict[uuid.UUID, bytes] = {}
 
+# Weak ETag of each cached progress blob (a checksum of its bytes, so it
+# matches across processes that serialise the same state)
+_progress_etags: Dict[uuid.UUID, str] = {}
 
-# In-memory job storage
-download_jobs: Dict[str, Dict] = {}
+# How many recent downloaded/failed files a job lists (the rest are only counted)
+RECENT_DOWNLOADED_FILES = 50
+RECENT_FAILED_FILES = 100
 
-# File-based storage path for local development
-JOB_STORAGE_DIR = Path(settings.TEMP_DOWNLOAD_DIR) / "jobs"
+# Jobs whose in-memory state is ahead of their job file
+_unsaved_jobs: Set[uuid.UUID] = set()
 
-# Create storage directory (for file-based fallback)
-try:
-    JOB_STORAGE_DIR.mkdir(parents=True, exist_ok=True)
-except (PermissionError, OSError):
-    pass
+# Seconds between job file writes while a download is making progress
+JOB_SAVE_INTERVAL = 1.0
 
+# Job files are written from the thread pool, so saves can finish out of
+# order: each save takes a version when the job is serialised, and a write
+# older than the job's last one is dropped
+_job_save_versions = itertools.count()
+_job_file_lock = threading.Lock()
+_written_versions: Dict[uuid.UUID, int] = {}
 
-async def download_file_async(session: aiohttp.ClientSession, url: str, filepath: Path, semaphore: asyncio.Semaphore):
+# Jobs being run by this process. Their in-memory copy is the newest one;
+# any other job may have been changed by another worker, see get_job_status.
+_running_jobs: Set[uuid.UUID] = set()
+
+# Version of the saved job each in-memory copy was last read from or
+# written as (the job store's version token, or the CRC of the saved job if
+# it has none)
+_store_versions: Dict[uuid.UUID, Hashable] = {}
+
+# When each job not run here was last checked against the job store
+# (time.monotonic()); it is checked at most every JOB_SAVE_INTERVAL, as often
+# as the worker running it saves it
+_store_checked_at: Dict[uuid.UUID, float] = {}
+
+
+def _forget_job(key: uuid.UUID):
+    """Drop a job's entries from the side tables above."""
+    job_locks.pop(key, None)
+    job_events.pop(key, None)
+    _progress_blobs.pop(key, None)
+    _progress_etags.pop(key, None)
+    _unsaved_jobs.discard(key)
+    _written_versions.pop(key, None)
+    _store_versions.pop(key, None)
+    _store_checked_at.pop(key, None)
+
+
+class _JobRegistry(TTLCache):
+    """
+    TTLCache of jobs that also forgets a job's side-table entries when it is evicted.
+    Expired jobs are already invisible to lookups, so they are only swept out
+    every JOB_EXPIRE_INTERVAL seconds rather than on every insert, or when the
+    registry is full (so expired jobs go before live ones). Jobs running in
+    this process are evicted last.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._next_expire = 0.0
+    
+    def expire(self, time=None):
+        if time is None:
+            time = self.timer()
+        if time < self._next_expire:
+            return
+        self._next_expire = time + JOB_EXPIRE_INTERVAL
+        
+        # expire() doesn't report what it removed, so note which jobs with
+        # side-table entries are stored now (expired or not: plain "in" hides
+        # expired ones) and forget those that are gone after. A job with
+        # entries that isn't stored yet, e.g. one being loaded back from the
+        # job store, keeps them.
+        tracked = [
+            key for key in (
+                set(job_locks) | set(job_events) | set(_progress_blobs)
+                | set(_unsaved_jobs) | set(_written_versions) | set(_store_versions)
+                | set(_store_checked_at)
+            )
+            if Cache.__contains__(self, key)
+        ]
+        super().expire(time)
+        for key in tracked:
+            if not Cache.__contains__(self, key):
+                _forget_job(key)
+    
+    def __setitem__(self, key, value, *args, **kwargs):
+        if not Cache.__contains__(self, key) and self.currsize + self.getsizeof(value) > self.maxsize:
+            # Full: sweep expired jobs now instead of evicting a live one
+            self._next_expire = 0.0
+        super().__setitem__(key, value, *args, **kwargs)
+    
+    def popitem(self):
+        # Oldest first (iteration follows insertion); a running job's worker
+        # still holds it, and a reloaded copy would go stale
+        for key in self:
+            if key not in _running_jobs:
+                job = self.pop(key)
+                break
+        else:
+            key, job = super().popitem()
+        _forget_job(key)
+        return key, job
+
+
+# In-memory job storage, keyed by UUID (hashes as an int, unlike the 36-char string).
+# Bounded, so finished jobs don't accumulate for the life of the process.
+download_jobs: Dict[uuid.UUID, Dict] = _JobRegistry(maxsize=JOB_REGISTRY_MAX, ttl=JOB_REGISTRY_TTL)
+
+# TTLCache isn't thread-safe, and jobs are created and cleaned up in the thread pool
+_jobs_lock = threading.RLock()
+
+# Status and message a new job starts with, per download method. ZIP jobs are
+# queued straight away; direct jobs wait for the browser to start them.
+# "stream" jobs run while their ZIP is being downloaded from /zip.
+_INITIAL_STATUS = {"zip": "initializing", "direct": "pending", "stream": "ready"}
+_INITIAL_MESSAGE = {
+    "zip": "Starting download... Please wait.",
+    "direct": "Initializing download...",
+    "stream": "Ready. Download the ZIP to start.",
+}
+
+# Season pages scraped at the same time while collecting a job's files
+SCRAPE_CONCURRENCY = 16
+
+# Files larger than this are fetched as parallel byte ranges
+RANGED_DOWNLOAD_THRESHOLD = 10 * 1024 * 1024
+RANGED_DOWNLOAD_PARTS = 4
+
+# Download attempts per file; only transient failures are retried
+DOWNLOAD_ATTEMPTS = 3
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+# Reusable write buffers, at most one per concurrent download
+DOWNLOAD_BUFFER_SIZE = 1 << 20
+_BUF_POOL: "queue.SimpleQueue[bytearray]" = queue.SimpleQueue()
+
+# Seconds a progress stream of a job run by this process waits for an
+# update before re-reading the job
+PROGRESS_STREAM_HEARTBEAT = 15
+
+# Where jobs are saved beyond the in-memory registry (see JOB_STORE_BACKEND)
+job_store = create_job_store()
+
+# Set once TEMP_DOWNLOAD_DIR exists (created lazily, not at import)
+_storage_dirs_ready = False
+
+
+def _ensure_storage_dirs():
+    """Create TEMP_DOWNLOAD_DIR on first use."""
+    global _storage_dirs_ready
+    if not _storage_dirs_ready:
+        Path(settings.TEMP_DOWNLOAD_DIR).mkdir(parents=True, exist_ok=True)
+        _storage_dirs_ready = True
+
+
+def get_job_files_dir(job: Dict) -> Path:
+    """
+    Get the directory a job's downloaded files are stored in.
+    
+    Args:
+        job: Job dictionary
+    
+    Returns:
+        Path inside the job's work directory
+    """
+    return Path(job["work_dir"]) / "files"
+
+
+def _retry_delay(attempt: int) -> float:
+    """Backoff before retry number `attempt` (1, 2, ...): 1s, 2s, ... plus up to 1s of jitter."""
+    return 2 ** (attempt - 1) + random.random()
+
+
+class RangeNotSupportedError(ValueError):
+    """A server answered a byte-range request with something other than 206."""
+
+
+async def ranged_get(
+    session: aiohttp.ClientSession,
+    url: str,
+    total: int,
+    nparts: int = RANGED_DOWNLOAD_PARTS,
+) -> bytearray:
+    """
+    Fetch a file as several byte ranges in parallel.
+    
+    Args:
+        session: aiohttp session
+        url: File URL (server must support "Accept-Ranges: bytes")
+        total: File size in bytes
+        nparts: Number of ranges to fetch concurrently
+    
+    Returns:
+        The file contents
+    
+    Raises:
+        RangeNotSupportedError: A range wasn't served as partial content
+    """
+    data = bytearray(total)
+    part_size = -(-total // nparts)  # ceil division
+    
+    async def fetch_part(start: int):
+        end = min(start + part_size, total) - 1
+        async with session.get(
+            url,
+            headers={"Range": f"bytes={start}-{end}"},
+            timeout=aiohttp.ClientTimeout(total=settings.DOWNLOAD_TIMEOUT),
+            ssl=False
+        ) as response:
+            if response.status != 206:
+                raise RangeNotSupportedError(f"HTTP {response.status} for range {start}-{end}")
+            
+            pos = start
+            async for chunk in response.content.iter_chunked(65536):
+                data[pos:pos + len(chunk)] = chunk
+                pos += len(chunk)
+            
+            if pos != end + 1:
+                raise ValueError(f"Incomplete range {start}-{end}")
+    
+    tasks = [asyncio.ensure_future(fetch_part(start)) for start in range(0, total, part_size)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        # One range failed: don't keep fetching the others
+        for task in tasks:
+            task.cancel()
+    
+    return data
+
+
+async def download_file_async(session: aiohttp.ClientSession, url: str, filepath: Path):
     """
     Download a single file asynchronously.
+    Transient failures (gateway errors, timeouts, dropped connections,
+    truncated bodies) are retried with exponential backoff before the file
+    counts as failed. A failed attempt's partial file is removed.
     
     Args:
         session: aiohttp session
         url: File URL to download
-        filepath: Path to save the file
-        semaphore: Semaphore to limit concurrent downloads
+        filepath: Path to save the file (its directory must already exist)
     
     Returns:
         Tuple of (success: bool, error_message: Optional[str])
     """
-    async with semaphore:
+    for attempt in range(DOWNLOAD_ATTEMPTS):
+        if attempt:
+            await asyncio.sleep(_retry_delay(attempt))
+        success, error, transient = await _download_file_once(session, url, filepath)
+        if success:
+            break
+        # Don't leave a partial file behind, whether or not it is retried
+        filepath.unlink(missing_ok=True)
+        if not transient:
+            break
+    return success, error
+
+
+async def _download_file_once(session: aiohttp.ClientSession, url: str, filepath: Path):
+    """
+    Make one attempt at downloading a file.
+    
+    Args:
+        session: aiohttp session
+        url: File URL to download
+        filepath: Path to save the file (overwritten if a previous attempt failed)
+    
+    Returns:
+        Tuple of (success: bool, error_message: Optional[str], transient: bool)
+    """
+    try:
+        # Disable SSL verification for downloads (some servers have certificate issues)
+        async with session.get(
+            url, 
+            timeout=aiohttp.ClientTimeout(total=settings.DOWNLOAD_TIMEOUT),
+            ssl=False
+        ) as response:
+            if response.status != 200:
+                return False, f"HTTP {response.status}", response.status in RETRY_STATUSES
+            
+            total = response.content_length or 0
+            if (
+                total <= RANGED_DOWNLOAD_THRESHOLD
+                or response.headers.get("Accept-Ranges") != "bytes"
+            ):
+                await _write_response(response, filepath)
+                return True, None, False
+            
+            # Large files that support ranges are re-fetched as parallel
+            # ranges; drop this connection instead of reading the body
+            response.close()
+        
         try:
-            # Disable SSL verification for downloads (some servers have certificate issues)
+            data = await ranged_get(session, url, total)
+        except RangeNotSupportedError:
+            # Advertised ranges but didn't serve one: fetch it in one stream
             async with session.get(
-                url, 
+                url,
                 timeout=aiohttp.ClientTimeout(total=settings.DOWNLOAD_TIMEOUT),
                 ssl=False
             ) as response:
-                if response.status == 200:
-                    # Create parent directory if it doesn't exist
-                    filepath.parent.mkdir(parents=True, exist_ok=True)
-                    
-                    # Download file
-                    with open(filepath, 'wb') as f:
-                        async for chunk in response.content.iter_chunked(8192):
-                            f.write(chunk)
-                    
-                    return True, None
-                else:
-                    return False, f"HTTP {response.status}"
+                if response.status != 200:
+                    return False, f"HTTP {response.status}", response.status in RETRY_STATUSES
+                await _write_response(response, filepath)
+            return True, None, False
+        
+        async with aiofiles.open(filepath, 'wb') as f:
+            await f.write(data)
+        return True, None, False
+    except asyncio.TimeoutError:
+        return False, "Timeout", True
+    except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError) as e:
+        # Dropped connections and bodies cut short mid-transfer
+        return False, str(e) or type(e).__name__, True
+    except Exception as e:
+        return False, str(e), False
+
+
+async def _write_response(response: aiohttp.ClientResponse, filepath: Path):
+    """
+    Stream a response body to a file, coalescing chunks in a pooled buffer so
+    the (threaded, non-blocking) file writes happen once per buffer.
+    
+    Args:
+        response: Response whose body is the file
+        filepath: Path to save the file
+    """
+    try:
+        buf = _BUF_POOL.get_nowait()
+    except queue.Empty:
+        buf = bytearray(DOWNLOAD_BUFFER_SIZE)
+    try:
+        async with aiofiles.open(filepath, 'wb') as f:
+            view = memoryview(buf)
+            filled = 0
+            async for chunk in response.content.iter_chunked(DOWNLOAD_BUFFER_SIZE):
+                if filled + len(chunk) > DOWNLOAD_BUFFER_SIZE:
+                    await f.write(view[:filled])
+                    filled = 0
+                view[filled:filled + len(chunk)] = chunk
+                filled += len(chunk)
+            await f.write(view[:filled])
+            view.release()
+    finally:
+        if _BUF_POOL.qsize() < settings.MAX_CONCURRENT_DOWNLOADS:
+            _BUF_POOL.put(buf)
+
+
+def _job_key(job_id: Union[str, uuid.UUID]) -> uuid.UUID:
+    """Normalise a job ID to the UUID used as the registry key."""
+    if isinstance(job_id, uuid.UUID):
+        return job_id
+    return uuid.UUID(job_id)
+
+
+def get_job_lock(job_id: Union[str, uuid.UUID]) -> asyncio.Lock:
+    """
+    Get the lock guarding mutations of a job.
+    
+    Args:
+        job_id: Job ID
+    
+    Returns:
+        The job's asyncio.Lock (created on first use)
+    """
+    return job_locks.setdefault(_job_key(job_id), asyncio.Lock())
+
+
+def notify_job_update(job_id: Union[str, uuid.UUID]):
+    """
+    Record that a job changed: drop its cached progress and wake any
+    progress streams waiting on it.
+    
+    Args:
+        job_id: Job ID
+    """
+    key = _job_key(job_id)
+    _progress_blobs.pop(key, None)
+    _progress_etags.pop(key, None)
+    
+    event = job_events.get(key)
+    if event is not None:
+        event.set()
+
+
+def mark_job_progress(job_id: Union[str, uuid.UUID]):
+    """
+    Record a progress change that doesn't need saving straight away.
+    Progress streams are woken now; the job file is rewritten by
+    _save_job_periodically, so a long job costs one write per
+    JOB_SAVE_INTERVAL rather than one per few files.
+    
+    Args:
+        job_id: Job ID
+    """
+    notify_job_update(job_id)
+    _unsaved_jobs.add(_job_key(job_id))
+
+
+async def _save_job_periodically(job_id: str, job: Dict):
+    """
+    Save a job whenever it has unsaved progress, every JOB_SAVE_INTERVAL
+    seconds, until cancelled.
+    
+    Args:
+        job_id: Job ID
+        job: Job dictionary
+    """
+    key = _job_key(job_id)
+    while True:
+        await asyncio.sleep(JOB_SAVE_INTERVAL)
+        if key in _unsaved_jobs:
+            await save_job_to_file_async(job_id, job)
+
+
+def _record_file_result(job: Dict, filename: str, error: Optional[str] = None):
+    """
+    Count a finished file on its job, keeping only the most recent names.
+    Jobs keep counters plus short lists of recent files rather than every
+    filename, so the job file (rewritten as the job progresses) stays small.
+    
+    Args:
+        job: Job dictionary
+        filename: Name of the file
+        error: Why the file failed, or None if it was downloaded
+    """
+    if error is None:
+        job["downloaded_count"] += 1
+        recent, item, keep = job["downloaded_files"], filename, RECENT_DOWNLOADED_FILES
+    else:
+        job["failed_count"] += 1
+        recent, item, keep = job["failed_files"], {"filename": filename, "error": error}, RECENT_FAILED_FILES
+    
+    recent.append(item)
+    if len(recent) > keep:
+        del recent[0]
+
+
+def get_job_progress(job: Dict) -> DownloadProgress:
+    """
+    Build the progress view of a job.
+    
+    Args:
+        job: Job dictionary
+    
+    Returns:
+        Dictionary with the fields of DownloadProgress
+    """
+    progress_data: DownloadProgress = {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "current_file": job["current_file"],
+        "total_files": job["total_files"],
+        "percentage": job["percentage"],
+        "message": job["message"],
+        # (job files saved before the counters existed have full lists)
+        "downloaded_count": job.get("downloaded_count", len(job["downloaded_files"])),
+        "failed_count": job.get("failed_count", len(job["failed_files"])),
+        "downloaded_files": job["downloaded_files"],
+        "failed_files": job["failed_files"],
+        "errors": job["errors"],
+        "zip_filename": job.get("zip_filename"),
+    }
+    
+    # Add direct download URLs if available
+    if job.get("direct_download_urls"):
+        progress_data["direct_download_urls"] = job["direct_download_urls"]
+    
+    return progress_data
+
+
+async def get_progress_blob(job_id: Union[str, uuid.UUID]) -> Optional[Tuple[bytes, str]]:
+    """
+    Get a job's progress serialised as JSON, with its ETag.
+    Serialised at most once per change, so repeated polls are a dict lookup.
+    
+    Args:
+        job_id: Job ID
+    
+    Returns:
+        Tuple of (JSON bytes, weak ETag of them), or None if the job doesn't exist
+    """
+    job = await get_job_status_async(job_id)
+    if not job:
+        return None
+    
+    key = _job_key(job_id)
+    blob = _progress_blobs.get(key)
+    etag = _progress_etags.get(key)
+    if blob is None or etag is None:
+        blob = orjson.dumps(get_job_progress(job))
+        etag = f'W/"{zlib.crc32(blob):08x}"'
+        _progress_blobs[key] = blob
+        _progress_etags[key] = etag
+    
+    return blob, etag
+
+
+async def job_stream(job_id: Union[str, uuid.UUID]) -> AsyncIterator[bytes]:
+    """
+    Yield a job's progress every time it changes, until it finishes.
+    
+    Args:
+        job_id: Job ID
+    
+    Yields:
+        Progress (see get_job_progress) serialised as JSON bytes
+    """
+    key = _job_key(job_id)
+    event = job_events.setdefault(key, asyncio.Event())
+    last_state = None
+    
+    while True:
+        job = await get_job_status_async(key)
+        if not job:
+            return
+        # Read before serialising, so a finished job's final state is yielded
+        finished = job["status"] in ("completed", "failed")
+        
+        # The job was just looked up, so this doesn't read the job store again
+        progress = await get_progress_blob(key)
+        if progress is None:
+            return
+        state = progress[0]
+        if state != last_state:
+            last_state = state
+            yield state
+        
+        if finished:
+            return
+        
+        # Wait for the worker to signal a change. A job run by another worker
+        # process never signals here, so poll the job store (through
+        # get_job_status_async) as often as that worker saves it.
+        timeout = PROGRESS_STREAM_HEARTBEAT if key in _running_jobs else JOB_SAVE_INTERVAL
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
         except asyncio.TimeoutError:
-            return False, "Timeout"
+            pass
+        event.clear()
+
+
+def create_http_session() -> aiohttp.ClientSession:
+    """
+    Create an aiohttp session with a pooled connector for fetching files.
+    Keep-alive connections are reused across files and jobs sharing the session.
+    
+    Returns:
+        New aiohttp ClientSession (caller must close it)
+    """
+    # Certificates are verified, so scraped pages (and the file URLs taken
+    # from them) can be trusted; only the file GETs themselves pass ssl=False
+    # (some file servers have certificate issues).
+    # Nearly every file comes from one host, so limit_per_host is the real
+    # throttle (too many streams to one host invite rate limiting); the total
+    # leaves headroom for ranged fetches and other hosts.
+    connector = aiohttp.TCPConnector(
+        limit=settings.MAX_CONCURRENT_DOWNLOADS * 2,
+        limit_per_host=settings.MAX_CONNECTIONS_PER_HOST,
+        ttl_dns_cache=600,
+        keepalive_timeout=60,  # keep idle connections for the next job
+        enable_cleanup_closed=True,
+    )
+    # trust_env honours HTTP(S)_PROXY settings. aiohttp asks for compressed
+    # responses itself (brotli too, when it is installed).
+    return aiohttp.ClientSession(
+        connector=connector,
+        trust_env=True,
+        headers={"User-Agent": settings.USER_AGENT},
+    )
+
+
+# Session shared by every job in this process (see get_http_session)
+_http_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """
+    Get the process-wide aiohttp session, creating it on first use.
+    Sharing one session keeps its DNS cache and keep-alive connections warm
+    across jobs. Must be called from the event loop.
+    
+    Returns:
+        Shared aiohttp ClientSession (closed by close_http_session)
+    """
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = create_http_session()
+    return _http_session
+
+
+async def close_http_session():
+    """Close the process-wide aiohttp session, if one was created."""
+    global _http_session
+    if _http_session is not None:
+        await _http_session.close()
+        _http_session = None
+
+
+async def run_job(
+    job_id: Union[str, uuid.UUID],
+    session: Optional[aiohttp.ClientSession] = None,
+):
+    """
+    Run a queued job using the arguments stored on it.
+    
+    Args:
+        job_id: Job ID
+        session: Shared aiohttp session used for file downloads
+    """
+    job = await get_job_status_async(job_id)
+    if not job:
+        raise ValueError(f"Job {job_id} not found")
+    
+    key = _job_key(job_id)
+    _running_jobs.add(key)
+    try:
+        if job["download_method"] == "direct":
+            await download_direct_files(
+                job["qualification"], job["subjects"], job["seasons"], job["job_id"]
+            )
+        else:
+            await download_bulk_files(
+                job["qualification"], job["subjects"], job["seasons"], job["job_id"], session
+            )
+    except Exception as e:
+        job["status"] = "failed"
+        job["message"] = f"Download failed: {str(e)}"
+        job["errors"].append(str(e))
+        await save_job_to_file_async(job_id, job)
+        raise
+    finally:
+        _running_jobs.discard(key)
+
+
+async def job_worker(queue: asyncio.Queue, session: Optional[aiohttp.ClientSession] = None):
+    """
+    Consume job IDs from the queue and run them one at a time.
+    Several workers share the queue so independent jobs progress concurrently.
+    
+    Args:
+        queue: Queue of job IDs
+        session: Shared aiohttp session used for file downloads
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+    
+    while True:
+        job_id = await queue.get()
+        try:
+            await run_job(job_id, session)
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+        finally:
+            queue.task_done()
+
+
+# Makes subject/season names safe to use as directory names (and as ZIP
+# entries extracted on Windows, which rejects all of these characters)
+_SAFE_NAME = str.maketrans(dict.fromkeys('/\\:*?"<>|', "-"))
+
+
+def _season_dir(dirs: Dict[Tuple[str, str], str], file_info: FileInfo, root: str = "") -> str:
+    """
+    Get the sanitised Subject/Season directory of a file.
+    All files of a season share it, so it's built once per season rather than
+    once per file.
+    
+    Args:
+        dirs: Directories built so far, keyed by (subject, season)
+        file_info: File to place
+        root: Directory the Subject/Season directories live in
+    
+    Returns:
+        root/Subject/Season
+    """
+    key = (file_info.subject, file_info.season)
+    season_dir = dirs.get(key)
+    if season_dir is None:
+        season_dir = dirs[key] = os.path.join(
+            root,
+            file_info.subject.translate(_SAFE_NAME),
+            file_info.season.translate(_SAFE_NAME),
+        )
+    return season_dir
+
+
+def _parse_seasons(seasons: List[str]) -> Dict[str, List[str]]:
+    """
+    Group "subjectCode:seasonId" keys by subject.
+    
+    Args:
+        seasons: List of season IDs in format "subjectCode:seasonId"
+    
+    Returns:
+        Dictionary of {subjectCode: [seasonIds]}, in selection order
+    """
+    season_map = collections.defaultdict(list)
+    for season_key in seasons:
+        subject_code, _, season_id = season_key.partition(":")
+        season_map[subject_code].append(season_id)
+    return season_map
+
+
+async def _collect_files(
+    qualification: str,
+    subjects: List[str],
+    seasons: List[str],  # Format: "subjectCode:seasonId"
+    errors: Optional[List[str]] = None,
+    session: Optional[aiohttp.ClientSession] = None,
+) -> List[FileInfo]:
+    """
+    Collect every exam file of the selected subjects and seasons.
+    Subjects are looked up concurrently, and so are the season pages of each
+    subject. Subject and season lookups are blocking, so they run in the
+    thread pool; season pages are fetched with the aiohttp session.
+    
+    Args:
+        qualification: Qualification ID
+        subjects: List of subject codes
+        seasons: List of season IDs in format "subjectCode:seasonId"
+        errors: If given, scraping errors are appended here instead of ignored
+        session: aiohttp session (the process-wide one if omitted)
+    
+    Returns:
+        List of FileInfo records, in subject/season selection order
+    """
+    season_map = _parse_seasons(seasons)
+    
+    if session is None:
+        session = get_http_session()
+    
+    semaphore = asyncio.Semaphore(SCRAPE_CONCURRENCY)
+    
+    # All subjects come from one cached list, so resolve them together
+    # (a cold cache is then scraped once, not once per subject)
+    subject_infos = await run_in_threadpool(
+        lambda: [subject_service.get_subject_by_code(qualification, code) for code in subjects]
+    )
+    
+    async def collect_season(subject: Dict, subject_code: str, season_id: str, season: Dict) -> List[FileInfo]:
+        try:
+            async with semaphore:
+                exams = await cache_service.get_exams_cached_async(season["url"], session)
         except Exception as e:
-            return False, str(e)
+            if errors is not None:
+                errors.append(f"Error getting files for {subject_code}/{season_id}: {str(e)}")
+            return []
+        
+        return [
+            FileInfo(exam.url, exam.name, subject["name"], subject_code, season["name"], season_id)
+            for exam in exams
+        ]
+    
+    async def collect_subject(subject: Dict, subject_code: str) -> List[List[FileInfo]]:
+        # Likewise the seasons of one subject share one cached list
+        season_ids = season_map.get(subject_code, [])
+        async with semaphore:
+            season_infos = await run_in_threadpool(
+                lambda: [
+                    season_service.get_season_by_id(qualification, subject_code, season_id)
+                    for season_id in season_ids
+                ]
+            )
+        
+        return await asyncio.gather(*(
+            collect_season(subject, subject_code, season_id, season)
+            for season_id, season in zip(season_ids, season_infos)
+            if season
+        ))
+    
+    per_subject = await asyncio.gather(*(
+        collect_subject(subject, subject_code)
+        for subject_code, subject in zip(subjects, subject_infos)
+        if subject
+    ))
+    
+    return [
+        file_info
+        for per_season in per_subject
+        for season_files in per_season
+        for file_info in season_files
+    ]
 
 
 async def download_bulk_files(
     qualification: str,
     subjects: List[str],
     seasons: List[str],  # Format: "subjectCode:seasonId"
-    job_id: str
+    job_id: str,
+    session: Optional[aiohttp.ClientSession] = None,
 ) -> Dict:
     """
     Download all files for selected subjects and seasons.
@@ -82,12 +851,13 @@ async def download_bulk_files(
         subjects: List of subject codes
         seasons: List of season IDs in format "subjectCode:seasonId"
         job_id: Unique job ID
+        session: aiohttp session (the process-wide one if omitted)
     
     Returns:
         Dictionary with download results
     """
     # Get job (from memory or file)
-    job = get_job_status(job_id)
+    job = await get_job_status_async(job_id)
     if not job:
         raise ValueError(f"Job {job_id} not found")
     
@@ -99,57 +869,30 @@ async def download_bulk_files(
     job["total_files"] = 0
     
     # Save to file system (for serverless)
-    save_job_to_file(job_id, job)
+    await save_job_to_file_async(job_id, job)
     
-    # Parse seasons into structured format
-    season_map = {}  # {subjectCode: [seasonIds]}
-    for season_key in seasons:
-        subject_code, season_id = season_key.split(":", 1)
-        if subject_code not in season_map:
-            season_map[subject_code] = []
-        season_map[subject_code].append(season_id)
+    # Use the process-wide session unless the caller passes its own
+    if session is None:
+        session = get_http_session()
     
     # Collect all file URLs
-    all_files = []  # List of {url, filepath, subject_code, season_id, filename}
-    total_files = 0
-    
-    for subject_code in subjects:
-        # Get subject details
-        subject = subject_service.get_subject_by_code(qualification, subject_code)
-        if not subject:
-            continue
-        
-        # Get seasons for this subject
-        subject_seasons = season_map.get(subject_code, [])
-        
-        for season_id in subject_seasons:
-            # Get season details
-            season = season_service.get_season_by_id(qualification, subject_code, season_id)
-            if not season:
-                continue
-            
-            # Get all files for this season
-            try:
-                exams = web_scraper.get_exams(season["url"])
-                
-                for exam in exams:
-                    # Create organized file path
-                    # Structure: Subject-Code/Season-Name/filename.pdf
-                    safe_subject_name = subject["name"].replace("/", "-").replace("\\", "-")
-                    safe_season_name = season["name"].replace("/", "-").replace("\\", "-")
-                    
-                    filepath = Path(settings.TEMP_DOWNLOAD_DIR) / job_id / safe_subject_name / safe_season_name / exam.name
-                    
-                    all_files.append({
-                        "url": exam.url,
-                        "filepath": filepath,
-                        "subject_code": subject_code,
-                        "season_id": season_id,
-                        "filename": exam.name,
-                    })
-                    total_files += 1
-            except Exception as e:
-                job["errors"].append(f"Error getting files for {subject_code}/{season_id}: {str(e)}")
+    files_dir = str(get_job_files_dir(job))
+    season_dirs: Dict[Tuple[str, str], str] = {}
+    all_files = [
+        # Create organized file path (a plain string; Path objects are much larger)
+        # Structure: Subject-Code/Season-Name/filename.pdf
+        file_info._replace(filepath=os.path.join(
+            _season_dir(season_dirs, file_info, files_dir),
+            file_info.filename,
+        ))
+        for file_info in await _collect_files(qualification, subjects, seasons, job["errors"], session)
+    ]
+    total_files = len(all_files)
+    
+    # Create each Subject/Season directory once, rather than once per file
+    await run_in_threadpool(
+        lambda: [os.makedirs(season_dir, exist_ok=True) for season_dir in season_dirs.values()]
+    )
     
     job["total_files"] = total_files
     job["message"] = f"Found {total_files} files. Starting downloads..."
@@ -157,216 +900,527 @@ async def download_bulk_files(
     if total_files == 0:
         job["status"] = "failed"
         job["message"] = "No files found to download."
-        save_job_to_file(job_id, job)
+        await save_job_to_file_async(job_id, job)
         return job
     
     job["status"] = "downloading"
     job["message"] = f"Downloading {total_files} files..."
-    save_job_to_file(job_id, job)
+    await save_job_to_file_async(job_id, job)
     
-    # Download files with concurrency limit
-    semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_DOWNLOADS)
     downloaded_count = 0
-    failed_count = 0
-    
-    # Create aiohttp session with SSL disabled (some servers have cert issues)
-    connector = aiohttp.TCPConnector(ssl=False)
-    async with aiohttp.ClientSession(connector=connector) as session:
-        # Create download tasks with file info tracking
-        async def download_with_tracking(file_info):
-            """Download file and return result with file info."""
+    
+    # A fixed pool of workers fed through a bounded queue, so only a handful
+    # of downloads (and queued files) are in flight however large the job is
+    worker_count = min(settings.MAX_CONCURRENT_DOWNLOADS, total_files)
+    pending: asyncio.Queue = asyncio.Queue(maxsize=settings.MAX_CONCURRENT_DOWNLOADS * 2)
+    
+    async def feed():
+        """Queue every file, then one stop marker per worker."""
+        for file_info in all_files:
+            await pending.put(file_info)
+        for _ in range(worker_count):
+            await pending.put(None)
+    
+    async def work():
+        """Download queued files until the stop marker, recording each result."""
+        nonlocal downloaded_count
+        while True:
+            file_info = await pending.get()
+            if file_info is None:
+                return
+            
             success, error = await download_file_async(
                 session,
-                file_info["url"],
-                file_info["filepath"],
-                semaphore
+                file_info.url,
+                Path(file_info.filepath),
             )
-            return success, error, file_info
-        
-        # Create all download tasks
-        download_tasks = [
-            download_with_tracking(file_info) 
-            for file_info in all_files
-        ]
-        
-        # Process downloads concurrently using as_completed
-        # This allows downloads to run in parallel (up to semaphore limit)
-        # and we process results as they complete
-        for coro in asyncio.as_completed(download_tasks):
-            success, error, file_info = await coro
             downloaded_count += 1
             job["current_file"] = downloaded_count
+            mark_job_progress(job_id)
             
-            if success:
-                job["downloaded_files"].append(file_info["filename"])
-            else:
-                failed_count += 1
-                job["failed_files"].append({
-                    "filename": file_info["filename"],
-                    "error": error
-                })
+            _record_file_result(job, file_info.filename, None if success else error)
+            if not success:
                 # Log failed downloads to console for debugging
                 import logging
                 logger = logging.getLogger(__name__)
-                logger.error(f"Failed to download '{file_info['filename']}': {error}")
+                logger.error(f"Failed to download '{file_info.filename}': {error}")
             
             # Update percentage
             if total_files > 0:
                 job["percentage"] = (downloaded_count / total_files) * 100
-            
-            # Save job to file system periodically (every 10 files or on status change)
-            if downloaded_count % 10 == 0 or downloaded_count == total_files:
-                save_job_to_file(job_id, job)
     
-    # Create ZIP archive
-    job["status"] = "creating_zip"
-    job["message"] = "Creating ZIP archive..."
-    job["percentage"] = 95
-    save_job_to_file(job_id, job)
-    
-    zip_path = create_zip_archive(job_id, subjects, qualification)
+    tasks = [asyncio.ensure_future(feed())]
+    tasks += [asyncio.ensure_future(work()) for _ in range(worker_count)]
+    saver = asyncio.ensure_future(_save_job_periodically(job_id, job))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        # If a worker failed, the feeder may be blocked on the full queue
+        for task in tasks:
+            task.cancel()
+        saver.cancel()
     
+    # No archive is built here: /zip streams one from the downloaded files
     job["status"] = "completed"
     job["completed_at"] = datetime.now().isoformat()
-    job["zip_path"] = str(zip_path)
-    job["zip_filename"] = zip_path.name
+    job["zip_filename"] = f"{qualification}_{job_id[:8]}.zip"
     job["percentage"] = 100
-    job["message"] = f"Download complete! {downloaded_count} files downloaded, {failed_count} failed."
+    job["message"] = (
+        f"Download complete! {job['downloaded_count']} files downloaded, "
+        f"{job['failed_count']} failed."
+    )
     
     # Save final job state
-    save_job_to_file(job_id, job)
+    await save_job_to_file_async(job_id, job)
     
     return job
 
 
-def create_zip_archive(job_id: str, subjects: List[str], qualification: str) -> Path:
+def _iter_files(root: Union[str, Path], prefix: str = "") -> Iterator[Tuple[str, str]]:
     """
-    Create a ZIP archive from downloaded files.
+    Walk a directory for the files to put in a ZIP.
+    Uses os.scandir directly: each entry's type comes from the directory
+    listing (no extra stat), and relative paths are built while descending
+    instead of with os.path.relpath per file.
     
     Args:
-        job_id: Job ID
-        subjects: List of subject codes
-        qualification: Qualification ID
+        root: Directory to walk
+        prefix: Relative path of root inside the archive (for recursion)
+    
+    Yields:
+        (file path, path relative to the top-level root) string pairs
+    """
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_files(entry.path, f"{prefix}{entry.name}/")
+            elif entry.is_file():
+                yield entry.path, f"{prefix}{entry.name}"
+
+
+def build_zip_stream(job: Dict) -> Optional[ZipStream]:
+    """
+    Build a streaming ZIP archive over the files downloaded for a job.
+    Nothing is written to disk; the archive is produced while it is being sent.
+    
+    Args:
+        job: Job dictionary
+    
+    Returns:
+        Sized ZipStream (len() gives the final archive size), or None if the
+        job's files are gone (e.g. its work directory was removed since it
+        completed)
+    """
+    if not job.get("work_dir"):
+        return None
+    temp_dir = get_job_files_dir(job)
+    if not temp_dir.is_dir():
+        return None
+    
+    # PDFs are already compressed internally, so store them as-is
+    zs = ZipStream(compress_type=ZIP_STORED, sized=True)
+    for file_path, arcname in _iter_files(temp_dir):
+        zs.add_path(file_path, arcname)
+    
+    return zs
+
+
+class _ZipSink:
+    """
+    Unseekable file object that collects what zipfile writes, so the archive
+    can be yielded piece by piece instead of being written anywhere.
+    """
+    
+    def __init__(self):
+        self._chunks: List[bytes] = []
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self) -> bytes:
+        """Return and forget everything written since the last drain."""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def _fetch_file(session: aiohttp.ClientSession, url: str, semaphore: asyncio.Semaphore) -> bytes:
+    """
+    Fetch a whole file into memory, retrying transient failures like
+    download_file_async.
+    
+    Args:
+        session: aiohttp session
+        url: File URL
+        semaphore: Semaphore to limit concurrent downloads
     
     Returns:
-        Path to created ZIP file
+        File contents
+    """
+    for attempt in range(DOWNLOAD_ATTEMPTS):
+        if attempt:
+            # Back off without holding a download slot
+            await asyncio.sleep(_retry_delay(attempt))
+        last_attempt = attempt == DOWNLOAD_ATTEMPTS - 1
+        try:
+            async with semaphore:
+                async with session.get(
+                    url,
+                    timeout=aiohttp.ClientTimeout(total=settings.DOWNLOAD_TIMEOUT),
+                    ssl=False
+                ) as response:
+                    if response.status in RETRY_STATUSES and not last_attempt:
+                        continue
+                    if response.status != 200:
+                        raise ValueError(f"HTTP {response.status}")
+                    return await response.read()
+        except (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError):
+            # Timeouts, dropped connections and bodies cut short mid-transfer
+            if last_attempt:
+                raise
+
+
+async def stream_job_zip(job_id: str, session: aiohttp.ClientSession) -> AsyncIterator[bytes]:
+    """
+    Download a "stream" job's files and yield them as a ZIP archive, without
+    touching the disk. Each file is held in memory only until it has been
+    added to the archive; at most MAX_CONCURRENT_DOWNLOADS are fetched ahead.
+    Failed files are left out of the archive (and counted in failed_count).
+    
+    Args:
+        job_id: Job ID
+        session: Shared aiohttp session
+    
+    Yields:
+        Consecutive pieces of the ZIP archive
     """
-    temp_dir = Path(settings.TEMP_DOWNLOAD_DIR) / job_id
-    zip_filename = f"{qualification}_{job_id[:8]}.zip"
-    zip_path = Path(settings.TEMP_DOWNLOAD_DIR) / zip_filename
+    job = await get_job_status_async(job_id)
+    key = _job_key(job_id)
+    _running_jobs.add(key)
+    job["status"] = "collecting_files"
+    job["started_at"] = datetime.now().isoformat()
+    job["message"] = "Collecting file URLs from website..."
+    await save_job_to_file_async(job_id, job)
     
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for file_path in temp_dir.rglob('*'):
-            if file_path.is_file():
-                # Get relative path for ZIP structure
-                arcname = file_path.relative_to(temp_dir)
-                zipf.write(file_path, arcname)
+    semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_DOWNLOADS)
+    pending = collections.deque()  # (file_info, fetch task), in archive order
+    sink = _ZipSink()
+    saver = asyncio.ensure_future(_save_job_periodically(job_id, job))
     
-    return zip_path
+    try:
+        all_files = await _collect_files(
+            job["qualification"], job["subjects"], job["seasons"], job["errors"], session
+        )
+        total_files = len(all_files)
+        
+        if total_files == 0:
+            # Like download_bulk_files; fail the response too rather than
+            # sending an empty archive
+            job["status"] = "failed"
+            job["message"] = "No files found to download."
+            await save_job_to_file_async(job_id, job)
+            raise DownloadError(f"No files found for job {job_id}")
+        
+        job["status"] = "downloading"
+        job["total_files"] = total_files
+        job["message"] = f"Downloading {total_files} files..."
+        await save_job_to_file_async(job_id, job)
+        
+        files = iter(all_files)
+        
+        def fetch_ahead():
+            while len(pending) < settings.MAX_CONCURRENT_DOWNLOADS:
+                file_info = next(files, None)
+                if file_info is None:
+                    return
+                task = asyncio.ensure_future(_fetch_file(session, file_info.url, semaphore))
+                pending.append((file_info, task))
+        
+        # PDFs are already compressed internally, so store them as-is
+        zipf = zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED, allowZip64=True)
+        arc_dirs: Dict[Tuple[str, str], str] = {}
+        processed = 0
+        failed_count = 0
+        
+        fetch_ahead()
+        while pending:
+            file_info, task = pending.popleft()
+            fetch_ahead()
+            
+            try:
+                data = await task
+            except Exception as e:
+                failed_count += 1
+                error = "Timeout" if isinstance(e, asyncio.TimeoutError) else str(e)
+                _record_file_result(job, file_info.filename, error)
+            else:
+                # (zipfile turns os.sep into "/" in archive names)
+                arcname = os.path.join(_season_dir(arc_dirs, file_info), file_info.filename)
+                zipf.writestr(arcname, data)
+                del data
+                _record_file_result(job, file_info.filename)
+                yield sink.drain()
+            
+            processed += 1
+            job["current_file"] = processed
+            job["percentage"] = (processed / total_files) * 100
+            mark_job_progress(job_id)
+        
+        zipf.close()
+        yield sink.drain()
+        
+        job["status"] = "completed"
+        job["completed_at"] = datetime.now().isoformat()
+        job["percentage"] = 100
+        job["message"] = f"Download complete! {processed - failed_count} files downloaded, {failed_count} failed."
+        await save_job_to_file_async(job_id, job)
+    finally:
+        # Client went away (or something failed): stop fetching
+        for _file_info, task in pending:
+            task.cancel()
+        saver.cancel()
+        try:
+            if job["status"] not in ("completed", "failed"):
+                job["status"] = "failed"
+                job["message"] = "ZIP stream was interrupted."
+                # Off the event loop; shielded so a cancelled stream still saves
+                await asyncio.shield(save_job_to_file_async(job_id, job))
+        finally:
+            _running_jobs.discard(key)
 
 
 def create_download_job(
     qualification: str, 
     subjects: List[str], 
     seasons: List[str],
-    download_method: str = "zip"
-) -> str:
+    download_method: str = "zip",
+    files: Optional[List[Dict]] = None,
+) -> uuid.UUID:
     """
     Create a new download job (without starting it).
-    Stores in both memory and file system for serverless compatibility.
+    Stores in both memory and the job store for serverless compatibility.
     
     Args:
         qualification: Qualification ID
         subjects: List of subject codes
         seasons: List of season IDs in format "subjectCode:seasonId"
-        download_method: "zip" or "direct"
+        download_method: "zip", "direct" or "stream"
+        files: Direct jobs only: file list already known, so the job is
+            ready without collecting it
     
     Returns:
         Job ID
     """
-    job_id = str(uuid.uuid4())
+    job_id = uuid.uuid4()
+    
+    # ZIP jobs get their own work directory, removed in one go by cleanup_job
+    # (direct and stream jobs never touch the disk)
+    work_dir = None
+    if download_method == "zip":
+        _ensure_storage_dirs()
+        work_dir = tempfile.mkdtemp(prefix="pp_", dir=settings.TEMP_DOWNLOAD_DIR)
     
     job_data = {
-        "job_id": job_id,
+        "job_id": str(job_id),
+        "work_dir": work_dir,
         "qualification": qualification,
         "subjects": subjects,
         "seasons": seasons,
         "download_method": download_method,
-        "status": "pending",
+        "status": _INITIAL_STATUS[download_method],
         "current_file": 0,
         "total_files": 0,
         "percentage": 0,
-        "message": "Initializing download...",
-        "downloaded_files": [],
-        "failed_files": [],
+        "message": _INITIAL_MESSAGE[download_method],
+        "downloaded_count": 0,
+        "failed_count": 0,
+        "downloaded_files": [],  # most recent only
+        "failed_files": [],  # most recent only
         "errors": [],
         "created_at": datetime.now().isoformat(),
-        "zip_path": None,
         "zip_filename": None,
         "direct_download_urls": [],  # For direct downloads
     }
+    if files:
+        job_data["status"] = "ready"
+        job_data["total_files"] = len(files)
+        job_data["message"] = direct_ready_message(len(files))
+        job_data["direct_download_urls"] = files
     
     # Store in memory (for fast access)
-    download_jobs[job_id] = job_data
+    with _jobs_lock:
+        download_jobs[job_id] = job_data
     
-    # Store in file system for persistence
-    try:
-        # Ensure directory exists
-        JOB_STORAGE_DIR.mkdir(parents=True, exist_ok=True)
-        
-        job_file = JOB_STORAGE_DIR / f"{job_id}.json"
-        with open(job_file, 'w') as f:
-            json.dump(job_data, f)
-            f.flush()  # Flush before closing
-    except (PermissionError, OSError) as e:
-        # If file storage fails, continue with memory only
-        import logging
-        logging.warning(f"Failed to save job to file: {e}")
-        pass
+    # Store in the job store for persistence
+    save_job_to_file(job_id, job_data)
     
     return job_id
 
 
+def _snapshot_job(job_id: Union[str, uuid.UUID], job_data: Dict) -> Tuple[int, bytes]:
+    """
+    Serialise a job for saving, and mark it saved.
+    
+    Args:
+        job_id: Job ID
+        job_data: Job data dictionary
+    
+    Returns:
+        Tuple of (save version, serialised job)
+    """
+    # Every status change is saved, so this is where progress streams wake up
+    notify_job_update(job_id)
+    _unsaved_jobs.discard(_job_key(job_id))
+    return next(_job_save_versions), orjson.dumps(job_data)
+
+
+def _write_job_file(job_id: Union[str, uuid.UUID], version: int, blob: bytes):
+    """
+    Write a serialised job to the job store, unless a newer save got there first.
+    The store logs its own failures; the job carries on in memory.
+    
+    Args:
+        job_id: Job ID
+        version: Save version from _snapshot_job
+        blob: Serialised job
+    """
+    key = _job_key(job_id)
+    with _job_file_lock:
+        if version < _written_versions.get(key, -1):
+            return
+        store_version = job_store.set(key, blob)
+        _written_versions[key] = version
+        # The saved copy is this process's own: don't read it back
+        _store_versions[key] = store_version if store_version is not None else zlib.crc32(blob)
+
+
 def save_job_to_file(job_id: str, job_data: Dict):
     """
-    Save job data to file system for persistence.
+    Save job data to the job store for persistence.
+    
+    Args:
+        job_id: Job ID
+        job_data: Job data dictionary
+    """
+    _write_job_file(job_id, *_snapshot_job(job_id, job_data))
+
+
+async def save_job_to_file_async(job_id: str, job_data: Dict):
+    """
+    Save job data to the job store without blocking the event loop.
+    The job is serialised straight away; only the write is deferred to
+    the thread pool, so later changes to the job don't leak into this save.
     
     Args:
         job_id: Job ID
         job_data: Job data dictionary
     """
+    version, blob = _snapshot_job(job_id, job_data)
+    await run_in_threadpool(_write_job_file, job_id, version, blob)
+
+
+def _memory_job(key: uuid.UUID) -> Tuple[Optional[Dict], bool]:
+    """
+    Look a job up in memory.
+    
+    Args:
+        key: Job ID
+    
+    Returns:
+        Tuple of (job or None, whether the job store must be checked)
+    """
+    with _jobs_lock:
+        job = download_jobs.get(key)
+    if job is None:
+        return None, True
+    
+    # Jobs run here are always current; any other job may have been changed
+    # by another worker, but is only checked every JOB_SAVE_INTERVAL
+    if key in _running_jobs:
+        return job, False
+    now = time.monotonic()
+    if now < _store_checked_at.get(key, 0.0) + JOB_SAVE_INTERVAL:
+        return job, False
+    _store_checked_at[key] = now
+    return job, True
+
+
+def _read_saved_job(key: uuid.UUID, known: bool) -> Tuple[Optional[Dict], Optional[Hashable]]:
+    """
+    Read a job from the job store, unless it is unchanged since it was last
+    read or written here. Blocking: only store I/O, so it can run in the
+    thread pool.
+    
+    Args:
+        key: Job ID
+        known: Whether the job is in memory (if not, it is always read)
+    
+    Returns:
+        Tuple of (saved job, or None if unchanged or not saved; its version)
+    """
+    last_version = _store_versions.get(key) if known else None
+    version = job_store.version(key)
+    if version is not None and version == last_version:
+        return None, version
+    blob = job_store.get(key)
+    if blob is None:
+        # Not saved (memory store, or a failed write): memory is all there is
+        return None, None
+    if version is None:
+        version = zlib.crc32(blob)
+    if version == last_version:
+        return None, version
     try:
-        # Ensure directory exists
-        JOB_STORAGE_DIR.mkdir(parents=True, exist_ok=True)
-        
-        job_file = JOB_STORAGE_DIR / f"{job_id}.json"
-        
-        # Write to temporary file first, then rename (atomic operation)
-        temp_file = job_file.with_suffix('.tmp')
-        
-        with open(temp_file, 'w') as f:
-            json.dump(job_data, f)
-            f.flush()  # Flush before closing
-        
-        # Atomic rename (ensures file is complete)
-        temp_file.replace(job_file)
-        
-        # Verify file was written
-        if not job_file.exists():
-            raise OSError(f"Job file {job_file} was not created")
-            
-    except (PermissionError, OSError) as e:
-        # If file storage fails, continue with memory only
+        return orjson.loads(blob), version
+    except orjson.JSONDecodeError as e:
+        # Log error for debugging
         import logging
-        logging.warning(f"Failed to save job {job_id} to file: {e}")
-        # Don't raise - allow fallback to memory
-        pass
+        logging.warning(f"Error reading saved job {key}: {e}")
+        return None, None
 
 
-def get_job_status(job_id: str) -> Optional[Dict]:
+def _install_job(key: uuid.UUID, job: Optional[Dict], job_data: Optional[Dict], version: Hashable) -> Optional[Dict]:
+    """
+    Put a job read from the job store into memory.
+    
+    Args:
+        key: Job ID
+        job: In-memory job, if any
+        job_data: Job read by _read_saved_job (None if unchanged)
+        version: Its version
+    
+    Returns:
+        The current job
+    """
+    if job_data is None:
+        return job
+    
+    if job is None:
+        # Also load into memory for faster subsequent access
+        with _jobs_lock:
+            download_jobs[key] = job_data
+            _store_versions[key] = version
+        return job_data
+    
+    # Update in place, so callers holding the job see the change
+    with _jobs_lock:
+        job.update(job_data)
+        _store_versions[key] = version
+    # Another process changed it: wake this process's progress streams
+    notify_job_update(key)
+    return job
+
+
+def get_job_status(job_id: Union[str, uuid.UUID]) -> Optional[Dict]:
     """
     Get the status of a download job.
-    Checks memory first, then file system.
+    Checks memory first, then the job store. A job that another worker
+    process may be running is read again when its saved copy changes.
+    Blocks on the job store; async code uses get_job_status_async.
     
     Args:
         job_id: Job ID
@@ -374,46 +1428,62 @@ def get_job_status(job_id: str) -> Optional[Dict]:
     Returns:
         Job dictionary or None if not found.
     """
-    # First check memory (fast access)
-    if job_id in download_jobs:
-        return download_jobs[job_id]
+    try:
+        key = _job_key(job_id)
+    except ValueError:
+        return None
+    
+    job, check = _memory_job(key)
+    if not check:
+        return job
+    return _install_job(key, job, *_read_saved_job(key, job is not None))
+
+
+async def get_job_status_async(job_id: Union[str, uuid.UUID]) -> Optional[Dict]:
+    """
+    Get the status of a download job, reading the job store (when needed)
+    in the thread pool (see get_job_status).
+    
+    Args:
+        job_id: Job ID
     
-    # Then check file system
+    Returns:
+        Job dictionary or None if not found.
+    """
     try:
-        job_file = JOB_STORAGE_DIR / f"{job_id}.json"
-        if job_file.exists():
-            with open(job_file, 'r') as f:
-                job_data = json.load(f)
-                # Also load into memory for faster subsequent access
-                download_jobs[job_id] = job_data
-                return job_data
-        else:
-            # File doesn't exist - log for debugging
-            import logging
-            logging.debug(f"Job file not found: {job_file} (dir exists: {JOB_STORAGE_DIR.exists()})")
-    except (PermissionError, OSError, json.JSONDecodeError) as e:
-        # Log error for debugging
-        import logging
-        logging.warning(f"Error reading job file {job_id}: {e}")
-        pass
+        key = _job_key(job_id)
+    except ValueError:
+        return None
     
-    return None
+    job, check = _memory_job(key)
+    if not check:
+        return job
+    saved = await run_in_threadpool(_read_saved_job, key, job is not None)
+    return _install_job(key, job, *saved)
 
 
-def cleanup_job(job_id: str):
+def cleanup_job(job_id: Union[str, uuid.UUID]):
     """
-    Clean up temporary files for a job.
+    Delete a job: its downloaded files, its saved copy and its in-memory state.
     
     Args:
         job_id: Job ID
     """
-    if job_id in download_jobs:
-        temp_dir = Path(settings.TEMP_DOWNLOAD_DIR) / job_id
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir)
-        
-        # Keep job info for a while, but mark as cleaned
-        download_jobs[job_id]["cleaned"] = True
+    key = _job_key(job_id)
+    with _jobs_lock:
+        job = download_jobs.pop(key, None)
+    if job is None:
+        return
+    
+    # Downloaded files all live in the job's work directory
+    work_dir = job.get("work_dir")
+    if work_dir:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    # Remove the saved copy too, or get_job_status would load the job back
+    job_store.delete(key)
+    
+    _forget_job(key)
 
 
 async def download_direct_files(
@@ -435,63 +1505,33 @@ async def download_direct_files(
     Returns:
         Dictionary with download job info
     """
-    job = download_jobs[job_id]
+    job = await get_job_status_async(job_id)
     job["status"] = "collecting_files"
     job["started_at"] = datetime.now().isoformat()
-    
-    # Parse seasons into structured format
-    season_map = {}
-    for season_key in seasons:
-        subject_code, season_id = season_key.split(":", 1)
-        if subject_code not in season_map:
-            season_map[subject_code] = []
-        season_map[subject_code].append(season_id)
-    
-    # Collect all file URLs
-    all_files = []
-    total_files = 0
-    
-    job["status"] = "collecting_files"
     job["message"] = "Collecting file URLs..."
+    notify_job_update(job_id)
     
-    for subject_code in subjects:
-        subject = subject_service.get_subject_by_code(qualification, subject_code)
-        if not subject:
-            continue
-        
-        subject_seasons = season_map.get(subject_code, [])
-        
-        for season_id in subject_seasons:
-            season = season_service.get_season_by_id(qualification, subject_code, season_id)
-            if not season:
-                continue
-            
-            try:
-                exams = web_scraper.get_exams(season["url"])
-                
-                for exam in exams:
-                    all_files.append({
-                        "url": exam.url,
-                        "filename": exam.name,
-                        "subject": subject["name"],
-                        "subject_code": subject_code,
-                        "season": season["name"],
-                    })
-                    total_files += 1
-            except Exception as e:
-                job["errors"].append(f"Error getting files for {subject_code}/{season_id}: {str(e)}")
+    # Collect all file URLs
+    all_files = await _collect_files(qualification, subjects, seasons, job["errors"])
+    total_files = len(all_files)
     
-    job["total_files"] = total_files
-    job["status"] = "ready"
-    job["message"] = f"Ready to download {total_files} files. Click 'Start Download' to begin."
-    job["direct_download_urls"] = all_files
+    async with get_job_lock(job_id):
+        job["total_files"] = total_files
+        job["status"] = "ready"
+        job["message"] = direct_ready_message(total_files)
+        job["direct_download_urls"] = [file_info.to_dict() for file_info in all_files]
     
-    save_job_to_file(job_id, job)
+    await save_job_to_file_async(job_id, job)
     
     return job
 
 
-def get_direct_download_urls(
+def direct_ready_message(total_files: int) -> str:
+    """Message of a direct job whose file list is ready."""
+    return f"Ready to download {total_files} files. Click 'Start Download' to begin."
+
+
+async def get_direct_download_urls(
     qualification: str,
     subjects: List[str],
     seasons: List[str],
@@ -508,40 +1548,4 @@ def get_direct_download_urls(
     Returns:
         List of dictionaries with file info: {url, filename, subject, season}
     """
-    # Parse seasons into structured format
-    season_map = {}
-    for season_key in seasons:
-        subject_code, season_id = season_key.split(":", 1)
-        if subject_code not in season_map:
-            season_map[subject_code] = []
-        season_map[subject_code].append(season_id)
-    
-    file_urls = []
-    
-    for subject_code in subjects:
-        subject = subject_service.get_subject_by_code(qualification, subject_code)
-        if not subject:
-            continue
-        
-        subject_seasons = season_map.get(subject_code, [])
-        
-        for season_id in subject_seasons:
-            season = season_service.get_season_by_id(qualification, subject_code, season_id)
-            if not season:
-                continue
-            
-            try:
-                exams = web_scraper.get_exams(season["url"])
-                
-                for exam in exams:
-                    file_urls.append({
-                        "url": exam.url,
-                        "filename": exam.name,
-                        "subject": subject["name"],
-                        "subject_code": subject_code,
-                        "season": season["name"],
-                    })
-            except Exception as e:
-                continue
-    
-    return file_urls
+    return [file_info.to_dict() for file_info in await _collect_files(qualification, subjects, seasons)]
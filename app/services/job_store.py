@@ -0,0 +1,198 @@
+"""
+Persistent storage for download jobs.
+The download service keeps live jobs in memory; a job store is where they
+are saved so they survive restarts, eviction from memory, and (with Redis)
+can be read by every worker process.
+"""
+from typing import Hashable, Optional
+from pathlib import Path
+import logging
+import uuid
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# How long a saved job is kept by stores that expire entries (Redis)
+JOB_STORE_TTL = 24 * 3600  # 24 hours
+
+
+class JobStore:
+    """
+    Base job store: saves nothing, so jobs live only in the in-memory registry.
+    Stores handle their own errors (logging them), since the in-memory copy
+    of a job is always there to fall back on.
+    """
+
+    def get(self, key: uuid.UUID) -> Optional[bytes]:
+        """
+        Load a serialised job.
+
+        Args:
+            key: Job ID
+
+        Returns:
+            Serialised job, or None if not stored
+        """
+        return None
+
+    def version(self, key: uuid.UUID) -> Optional[Hashable]:
+        """
+        Get a cheap token that changes whenever the saved job does, so a
+        process can tell whether its copy is current without reading the job.
+
+        Args:
+            key: Job ID
+
+        Returns:
+            Version token, or None if the store can't tell without a read
+        """
+        return None
+
+    def set(self, key: uuid.UUID, blob: bytes) -> Optional[Hashable]:
+        """
+        Save a serialised job, replacing any previous version.
+
+        Args:
+            key: Job ID
+            blob: Serialised job
+
+        Returns:
+            Version token of this save (see version()), or None if unknown
+        """
+        return None
+
+    def delete(self, key: uuid.UUID):
+        """
+        Remove a saved job.
+
+        Args:
+            key: Job ID
+        """
+
+
+class FileJobStore(JobStore):
+    """One JSON file per job (works on a single host, and on serverless /tmp)."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        # Created on first save, not at import
+        self._dir_ready = False
+
+    def _path(self, key: uuid.UUID) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: uuid.UUID) -> Optional[bytes]:
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Error reading job file {key}: {e}")
+            return None
+
+    def version(self, key: uuid.UUID) -> Optional[Hashable]:
+        # Every save replaces the file, so its mtime and size change
+        try:
+            st = self._path(key).stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def set(self, key: uuid.UUID, blob: bytes) -> Optional[Hashable]:
+        try:
+            if not self._dir_ready:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self._dir_ready = True
+            
+            # Write to temporary file first, then rename (atomic operation)
+            job_file = self._path(key)
+            temp_file = job_file.with_suffix('.tmp')
+            with open(temp_file, 'wb') as f:
+                f.write(blob)
+            temp_file.replace(job_file)
+        except OSError as e:
+            # If file storage fails, continue with memory only
+            logger.warning(f"Failed to save job {key} to file: {e}")
+            return None
+        return self.version(key)
+
+    def delete(self, key: uuid.UUID):
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+
+class RedisJobStore(JobStore):
+    """
+    Jobs as Redis hashes that expire after JOB_STORE_TTL, shared by all workers.
+    Each hash holds the serialised job and a save counter, its version.
+    Redis is called synchronously: the download service only uses job
+    stores from the thread pool.
+    """
+
+    _PREFIX = "pp:job:"
+
+    def __init__(self, url: str):
+        import redis
+        self._redis = redis.Redis.from_url(url)
+        self._errors = redis.RedisError
+
+    def get(self, key: uuid.UUID) -> Optional[bytes]:
+        try:
+            return self._redis.hget(f"{self._PREFIX}{key}", "job")
+        except self._errors as e:
+            logger.warning(f"Redis job read failed: {e}")
+            return None
+
+    def version(self, key: uuid.UUID) -> Optional[Hashable]:
+        try:
+            version = self._redis.hget(f"{self._PREFIX}{key}", "version")
+        except self._errors as e:
+            logger.warning(f"Redis job read failed: {e}")
+            return None
+        return int(version) if version is not None else None
+
+    def set(self, key: uuid.UUID, blob: bytes) -> Optional[Hashable]:
+        name = f"{self._PREFIX}{key}"
+        try:
+            # One round trip; MULTI/EXEC so the job and its version change together
+            pipe = self._redis.pipeline()
+            pipe.hset(name, "job", blob)
+            pipe.hincrby(name, "version", 1)
+            pipe.expire(name, JOB_STORE_TTL)
+            _, version, _ = pipe.execute()
+        except self._errors as e:
+            logger.warning(f"Redis job write failed: {e}")
+            return None
+        return version
+
+    def delete(self, key: uuid.UUID):
+        try:
+            self._redis.delete(f"{self._PREFIX}{key}")
+        except self._errors as e:
+            logger.warning(f"Redis job delete failed: {e}")
+
+
+def create_job_store() -> JobStore:
+    """
+    Create the job store selected by settings.JOB_STORE_BACKEND.
+
+    Returns:
+        "file" (default): FileJobStore under TEMP_DOWNLOAD_DIR/jobs
+        "redis": RedisJobStore on REDIS_URL
+        "memory": JobStore, which saves nothing
+    """
+    backend = settings.JOB_STORE_BACKEND
+    if backend == "redis":
+        if not settings.REDIS_URL:
+            raise ValueError("JOB_STORE_BACKEND=redis requires REDIS_URL")
+        return RedisJobStore(settings.REDIS_URL)
+    if backend == "memory":
+        return JobStore()
+    if backend == "file":
+        return FileJobStore(Path(settings.TEMP_DOWNLOAD_DIR) / "jobs")
+    raise ValueError(f"Unknown JOB_STORE_BACKEND '{backend}'")
@@ -26,6 +26,9 @@ QUALIFICATIONS = [
     },
 ]
 
+# QUALIFICATIONS keyed by ID
+_QUALIFICATION_INDEX = {qual["id"]: qual for qual in QUALIFICATIONS}
+
 
 def get_all_qualifications():
     """
@@ -77,7 +80,4 @@ def get_qualification_by_id(qualification_id: str):
     Returns:
         Qualification dictionary or None if not found.
     """
-    for qual in QUALIFICATIONS:
-        if qual["id"] == qualification_id:
-            return qual
-    return None
+    return _QUALIFICATION_INDEX.get(qualification_id)
@@ -1,11 +1,25 @@
 """
 Service for fetching seasons (years) for a subject.
 """
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional
+import asyncio
 import re
 
+import aiohttp
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.models import LinkClass
 from app.services import web_scraper, subject_service, cache_service
 
+# Years in season names, e.g. "2024-May-June" or "Nov 01". Any 4-digit
+# 20xx year wins over a 2-digit one, so the 2-digit group only matches
+# when no 4-digit year follows (still one scan of the name)
+_YEAR = re.compile(r'\b(?P<y4>20\d{2})\b|\b(?P<y2>\d{2})\b(?!.*\b20\d{2}\b)')
+
+# Season pages fetched at once when counting a subject's files
+FILE_COUNT_CONCURRENCY = 5
+
 
 def get_seasons_for_subject(qualification_id: str, syllabus_code: str) -> List[dict]:
     """
@@ -34,27 +48,14 @@ def get_seasons_for_subject(qualification_id: str, syllabus_code: str) -> List[d
         # Get seasons using web scraper (only if not cached)
         seasons = web_scraper.get_exam_seasons(subject["url"])
         
-        # Convert to list of dictionaries with metadata
-        season_list = []
-        for season in seasons:
-            # Extract year from season name
-            year = extract_year_from_season(season.name)
-            
-            # Get file count for this season (uses cache)
-            file_count = get_season_file_count(season.url)
-            
-            season_dict = {
-                "id": season.name,
-                "name": season.name,
-                "year": year,
-                "url": season.url,
-                "file_count": file_count,
-            }
-            
-            season_list.append(season_dict)
+        # Get file count for each season (uses cache); on a cold cache each
+        # is a page fetch, so they run FILE_COUNT_CONCURRENCY at a time
+        file_counts = []
+        if seasons:
+            with ThreadPoolExecutor(max_workers=min(FILE_COUNT_CONCURRENCY, len(seasons))) as executor:
+                file_counts = list(executor.map(get_season_file_count, [season.url for season in seasons]))
         
-        # Sort by year (newest first)
-        season_list.sort(key=lambda x: x["year"], reverse=True)
+        season_list = _build_season_list(seasons, file_counts)
         
         # Cache the results
         cache_service.set_seasons_cache(qualification_id, syllabus_code, season_list)
@@ -64,6 +65,85 @@ def get_seasons_for_subject(qualification_id: str, syllabus_code: str) -> List[d
         raise Exception(f"Error fetching seasons: {str(e)}")
 
 
+async def get_seasons_for_subject_async(
+    qualification_id: str,
+    syllabus_code: str,
+    session: aiohttp.ClientSession,
+) -> List[dict]:
+    """
+    Get all seasons (years) for a specific subject, scraping with an aiohttp
+    session. On a cold cache every season page has to be fetched for its file
+    count; these are fetched concurrently (FILE_COUNT_CONCURRENCY at a time)
+    rather than one after another.
+    
+    Args:
+        qualification_id: The qualification ID (AICE, IGCSE, or O)
+        syllabus_code: The syllabus code (e.g., "9700")
+        session: aiohttp session to scrape with
+    
+    Returns:
+        List of season dictionaries with id, name, year, and file_count.
+    """
+    # Check cache first
+    cached_seasons = await run_in_threadpool(
+        cache_service.get_seasons_cached, qualification_id, syllabus_code
+    )
+    if cached_seasons is not None:
+        return cached_seasons
+    
+    # Get subject to get the URL
+    subject = await run_in_threadpool(subject_service.get_subject_by_code, qualification_id, syllabus_code)
+    
+    if not subject:
+        raise ValueError(f"Subject '{syllabus_code}' not found in qualification '{qualification_id}'")
+    
+    semaphore = asyncio.Semaphore(FILE_COUNT_CONCURRENCY)
+    
+    async def file_count(season_url: str) -> int:
+        async with semaphore:
+            return await get_season_file_count_async(season_url, session)
+    
+    try:
+        seasons = await web_scraper.get_exam_seasons_async(session, subject["url"])
+        
+        file_counts = await asyncio.gather(*(file_count(season.url) for season in seasons))
+        
+        season_list = _build_season_list(seasons, file_counts)
+        
+        await run_in_threadpool(cache_service.set_seasons_cache, qualification_id, syllabus_code, season_list)
+        
+        return season_list
+    except Exception as e:
+        raise Exception(f"Error fetching seasons: {str(e)}")
+
+
+def _build_season_list(seasons: List[LinkClass], file_counts: List[int]) -> List[dict]:
+    """
+    Convert scraped seasons to season dictionaries, newest first.
+    
+    Args:
+        seasons: Seasons from the web scraper
+        file_counts: File count of each season
+    
+    Returns:
+        List of season dictionaries with id, name, year, and file_count.
+    """
+    season_list = [
+        {
+            "id": season.name,
+            "name": season.name,
+            "year": extract_year_from_season(season.name),
+            "url": season.url,
+            "file_count": file_count,
+        }
+        for season, file_count in zip(seasons, file_counts)
+    ]
+    
+    # Sort by year (newest first)
+    season_list.sort(key=lambda x: x["year"], reverse=True)
+    return season_list
+
+
 def get_season_file_count(season_url: str) -> int:
     """
     Get the number of files available for a season.
@@ -81,7 +161,7 @@ def get_season_file_count(season_url: str) -> int:
         return cached_count
     
     try:
-        exams = web_scraper.get_exams(season_url)
+        exams = cache_service.get_exams_cached(season_url)
         count = len(exams)
         
         # Cache the result
@@ -93,6 +173,34 @@ def get_season_file_count(season_url: str) -> int:
         return 0
 
 
+async def get_season_file_count_async(season_url: str, session: aiohttp.ClientSession) -> int:
+    """
+    Get the number of files available for a season, scraping with an aiohttp
+    session on a cache miss.
+    
+    Args:
+        season_url: The URL of the season page
+        session: aiohttp session to scrape with
+    
+    Returns:
+        Number of files available.
+    """
+    cached_count = await run_in_threadpool(cache_service.get_file_count_cached, season_url)
+    if cached_count is not None:
+        return cached_count
+    
+    try:
+        exams = await cache_service.get_exams_cached_async(season_url, session)
+        count = len(exams)
+        
+        await run_in_threadpool(cache_service.set_file_count_cache, season_url, count)
+        
+        return count
+    except Exception:
+        # If fetching fails, return 0
+        return 0
+
+
 def extract_year_from_season(season_name: str) -> int:
     """
     Extract year from season name.
@@ -108,21 +216,20 @@ def extract_year_from_season(season_name: str) -> int:
     Returns:
         Year as integer, or 0 if not found.
     """
-    # Try to find 4-digit year
-    match = re.search(r'\b(20\d{2})\b', season_name)
-    if match:
-        return int(match.group(1))
+    match = _YEAR.search(season_name)
+    if not match:
+        return 0
     
-    # Try to find 2-digit year (assume 2000s)
-    match = re.search(r'\b(\d{2})\b', season_name)
-    if match:
-        year = int(match.group(1))
-        if year < 50:  # Assume 2000s
-            return 2000 + year
-        else:  # Assume 1900s
-            return 1900 + year
+    # 4-digit year
+    if match.group('y4'):
+        return int(match.group('y4'))
     
-    return 0
+    # 2-digit year
+    year = int(match.group('y2'))
+    if year < 50:  # Assume 2000s
+        return 2000 + year
+    else:  # Assume 1900s
+        return 1900 + year
 
 
 def get_season_by_id(qualification_id: str, syllabus_code: str, season_id: str) -> Optional[dict]:
@@ -137,10 +244,19 @@ def get_season_by_id(qualification_id: str, syllabus_code: str, season_id: str)
     Returns:
         Season dictionary or None if not found.
     """
-    seasons = get_seasons_for_subject(qualification_id, syllabus_code)
+    # Unknown seasons are remembered for a while rather than searched for again
+    # (keyed like the seasons cache, see cache_service.get_cache_key)
+    miss_key = f"season:{cache_service.get_cache_key(qualification_id, syllabus_code)}:{season_id}"
+    if cache_service.is_miss_cached(miss_key):
+        return None
     
-    for season in seasons:
-        if season["id"] == season_id:
-            return season
+    index = cache_service.get_seasons_index_cached(qualification_id, syllabus_code)
+    if index is None:
+        # Not cached yet: scrape (and cache) the list, then index it
+        get_seasons_for_subject(qualification_id, syllabus_code)
+        index = cache_service.get_seasons_index_cached(qualification_id, syllabus_code) or {}
     
-    return None
+    season = index.get(season_id)
+    if season is None:
+        cache_service.set_miss_cache(miss_key)
+    return season
@@ -2,11 +2,16 @@
 Service for fetching subjects for a qualification.
 """
 from typing import List, Optional
+import re
 
 from app.core.links import RemoteLinks
 from app.services import web_scraper, cache_service
 from app.services.qualification_service import get_qualification_by_id
 
+# Syllabus codes in subject names, e.g. "Biology (9700)"
+_CODE_4 = re.compile(r'\b(\d{4})\b')
+_CODE_ANY = re.compile(r'(\d+)')
+
 
 def get_subjects_for_qualification(qualification_id: str, search: Optional[str] = None) -> List[dict]:
     """
@@ -82,13 +87,25 @@ def get_subject_by_code(qualification_id: str, syllabus_code: str) -> Optional[d
     Returns:
         Subject dictionary or None if not found.
     """
-    subjects = get_subjects_for_qualification(qualification_id)
+    # Subjects are cached under the upper-cased qualification ID; misses too,
+    # so "aice" and "AICE" share one entry of each
+    qualification_key = qualification_id.upper()
+    
+    # Unknown codes are remembered for a while rather than searched for again
+    miss_key = f"subject:{qualification_key}:{syllabus_code}"
+    if cache_service.is_miss_cached(miss_key):
+        return None
     
-    for subject in subjects:
-        if subject["code"] == syllabus_code:
-            return subject
+    index = cache_service.get_subjects_index_cached(qualification_key)
+    if index is None:
+        # Not cached yet: scrape (and cache) the list, then index it
+        get_subjects_for_qualification(qualification_id)
+        index = cache_service.get_subjects_index_cached(qualification_key) or {}
     
-    return None
+    subject = index.get(syllabus_code)
+    if subject is None:
+        cache_service.set_miss_cache(miss_key)
+    return subject
 
 
 def extract_syllabus_code(subject_name: str) -> str:
@@ -107,13 +124,12 @@ def extract_syllabus_code(subject_name: str) -> str:
         Syllabus code as string, or empty string if not found.
     """
     # Try to find 4-digit number (most common format)
-    import re
-    match = re.search(r'\b(\d{4})\b', subject_name)
+    match = _CODE_4.search(subject_name)
     if match:
         return match.group(1)
     
     # Try to find any number sequence
-    match = re.search(r'(\d+)', subject_name)
+    match = _CODE_ANY.search(subject_name)
     if match:
         return match.group(1)
     
@@ -2,12 +2,204 @@
 Web scraping service for PapaCambridge.
 Moved from scripts/web_data.py - refactored for FastAPI.
 """
+import asyncio
+import logging
+import random
+import re
+import threading
+
+import aiohttp
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from cachetools import TTLCache
+from fastapi.concurrency import run_in_threadpool
+from requests.adapters import HTTPAdapter
 from urllib.parse import urljoin, unquote
+from urllib3.util.retry import Retry
 
+from app.core.config import settings
 from app.core.models import LinkClass
 
+logger = logging.getLogger(__name__)
+
+# lxml's C parser is several times faster than the pure-Python html.parser;
+# fall back to html.parser where lxml isn't installed
+try:
+    import lxml  # noqa: F401
+    _PARSER = "lxml"
+except ImportError:
+    _PARSER = "html.parser"
+
+# Only these links are built into the parse tree; the rest of the page is
+# skipped while parsing rather than built and then filtered out
+_CAIE_LINKS = SoupStrainer('a', href=re.compile(r'papers/caie/'))
+_DOWNLOAD_LINKS = SoupStrainer('a', href=re.compile(r'download_file\.php'))
+
+# The "files" parameter of a download_file.php link (kept raw: parse_qs would
+# also turn "+" into a space, which breaks file names containing "+")
+_FILES_PARAM = re.compile(r'files=([^&]*)')
+
+# Words (and year prefixes) that mark a link as a season link
+_SEASON_KEYWORDS = re.compile(r'nov|june|march|may|oct|202|201', re.IGNORECASE)
+
+# Site root that relative links are resolved against
+_BASE_URL = settings.PAPACAMBRIDGE_BASE_URL
+
+# The site serves UTF-8. Decoding with it directly skips charset detection,
+# which both HTTP clients otherwise run over the whole page whenever the
+# Content-Type has no charset (and requests may fall back to ISO-8859-1).
+PAGE_ENCODING = "utf-8"
+
+# Seconds allowed for fetching one page
+SCRAPE_TIMEOUT = 30
+
+# Responses that mean "slow down" or "try again"; a page fetch is retried up
+# to SCRAPE_RETRIES times on these (and on connection errors), waiting
+# SCRAPE_BACKOFF * 2**n seconds in between, so a rate-limited burst backs
+# off instead of hammering the site
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+SCRAPE_RETRIES = 5
+SCRAPE_BACKOFF = 0.5
+
+# Shared by every scrape, so pages from the same host reuse keep-alive
+# connections instead of a new TCP + TLS handshake each. Sessions are safe to
+# share between the thread-pool threads the scrapers run in; the pool is
+# sized for the concurrent lookups of a download job.
+_SESSION = requests.Session()
+# (requests already asks for gzip/deflate, and brotli when it is installed)
+_SESSION.headers["User-Agent"] = settings.USER_AGENT
+_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=SCRAPE_RETRIES,
+        backoff_factor=SCRAPE_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        raise_on_status=False,  # hand back the last response; raise_for_status reports it
+    ),
+)
+_SESSION.mount("http://", _adapter)
+_SESSION.mount("https://", _adapter)
+
+# Recently fetched pages by URL. The services cache what they parse out of
+# a page for much longer; this only stops the same page being fetched twice
+# in a row (e.g. a qualification page, scraped both for the qualification
+# list's subject counts and for its subject list), so it is small and short.
+PAGE_CACHE_TTL = 300  # 5 minutes
+_page_cache: TTLCache = TTLCache(maxsize=64, ttl=PAGE_CACHE_TTL)  # {url: html}
+_page_cache_lock = threading.Lock()
+
+
+def _get_cached_page(url: str):
+    with _page_cache_lock:
+        return _page_cache.get(url)
+
+
+def _set_cached_page(url: str, page: str):
+    with _page_cache_lock:
+        _page_cache[url] = page
+
+
+def clear_page_cache():
+    """Forget all recently fetched pages."""
+    with _page_cache_lock:
+        _page_cache.clear()
+
+
+def _fetch_page(url: str) -> str:
+    """
+    Fetch a page's HTML with the shared session (or from the page cache).
+    
+    Parameters:
+    url (str): The URL of the page
+    
+    Returns:
+    Page HTML
+    
+    Raises:
+    requests.HTTPError: If the page can't be fetched (an error page would
+    otherwise parse to an empty result, and be cached as one)
+    """
+    page = _get_cached_page(url)
+    if page is None:
+        response = _SESSION.get(url, timeout=SCRAPE_TIMEOUT)
+        response.raise_for_status()
+        response.encoding = PAGE_ENCODING
+        page = response.text
+        _set_cached_page(url, page)
+    return page
+
+
+async def _fetch_page_async(session: aiohttp.ClientSession, url: str) -> str:
+    """
+    Fetch a page's HTML with an aiohttp session (or from the page cache),
+    retrying like the requests session does.
+    
+    Parameters:
+    session (aiohttp.ClientSession): Session to fetch the page with
+    url (str): The URL of the page
+    
+    Returns:
+    Page HTML
+    
+    Raises:
+    aiohttp.ClientResponseError: If the page can't be fetched
+    """
+    page = _get_cached_page(url)
+    if page is not None:
+        return page
+    
+    for retry in range(SCRAPE_RETRIES + 1):
+        last_attempt = retry == SCRAPE_RETRIES
+        try:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=SCRAPE_TIMEOUT)) as response:
+                if response.status not in RETRY_STATUSES or last_attempt:
+                    response.raise_for_status()
+                    page = await response.text(PAGE_ENCODING, errors="replace")
+                    _set_cached_page(url, page)
+                    return page
+        except (asyncio.TimeoutError, aiohttp.ClientConnectionError):
+            if last_attempt:
+                raise
+        
+        # Jittered, so concurrent fetches don't all retry at the same moment
+        await asyncio.sleep(SCRAPE_BACKOFF * 2 ** retry * (0.5 + random.random()))
+
+
+def _absolute_url(href: str, page_url: str) -> str:
+    """
+    Make a link absolute. Links on the site are nearly all relative to its
+    root, so those are joined onto the base URL directly; urljoin (a full
+    URL parse) is only needed for anything else.
+    
+    Parameters:
+    href (str): Link as found on the page
+    page_url (str): The URL of the page the link is on
+    
+    Returns:
+    Absolute URL
+    """
+    if href[:1] == '/':
+        return _BASE_URL + href
+    if href[:7] == 'papers/':
+        return _BASE_URL + '/' + href
+    return urljoin(page_url, href)
+
+
+def _is_subject_href(href: str, pattern: str) -> bool:
+    """
+    Check whether a link points to a subject page of a qualification.
+    
+    Parameters:
+    href (str): Link as found on the page
+    pattern (str): Pattern used to identify valid links
+    
+    Returns:
+    True if it's a relative link to a subject page containing the pattern
+    """
+    # Cheapest check (and the one most links fail) first
+    return (href.startswith('papers/caie/') or href.startswith('/papers/caie/')) and pattern in href.lower()
+
 
 def get_exam_classes(url: str, pattern: str):
     """
@@ -20,32 +212,20 @@ def get_exam_classes(url: str, pattern: str):
     Returns:
     List of LinkClass objects
     """
-    print('Fetching Exam links...')
-    page = requests.get(url).text
-    soup = BeautifulSoup(page, "html.parser")
-    exams = []
+    logger.debug("Fetching exam links from %s", url)
+    page = _fetch_page(url)
+    soup = BeautifulSoup(page, _PARSER, parse_only=_CAIE_LINKS)
     
     # Find all links that contain the pattern and look like subject links
-    all_links = soup.find_all('a', href=True)
-    for a in all_links:
-        href = a.get('href', '')
-        text = a.text.strip()
-        
-        # Check if this is a subject link
-        if pattern in href.lower() and ('-' in href or text):
-            # Make sure it's a relative link to a subject page
-            if href.startswith('papers/caie/') or href.startswith('/papers/caie/'):
-                # Fix URL - if href is relative, make it absolute
-                if href.startswith('/'):
-                    full_url = 'https://pastpapers.papacambridge.com' + href
-                elif href.startswith('papers/'):
-                    full_url = 'https://pastpapers.papacambridge.com/' + href
-                else:
-                    full_url = urljoin(url, href)
-                exams.append(LinkClass(text, full_url))
-                print(f"Found: {text}")
-    
-    print(f'Finished fetching {len(exams)} Exam links')
+    # (the text is only read for links that pass the href checks)
+    exams = [
+        LinkClass(text, _absolute_url(href, url))
+        for a in soup.find_all('a')
+        if _is_subject_href(href := a.get('href', ''), pattern)
+        and ((text := a.text.strip()) or '-' in href)
+    ]
+    
+    logger.info("Found %d exam links at %s", len(exams), url)
     return exams
 
 
@@ -59,35 +239,63 @@ def get_exam_seasons(url: str):
     Returns:
     List of LinkClass objects
     """
-    print('Fetching exam seasons')
-    page = requests.get(url).text
-    soup = BeautifulSoup(page, "html.parser")
+    logger.debug("Fetching exam seasons from %s", url)
+    return parse_exam_seasons(_fetch_page(url), url)
+
+
+async def get_exam_seasons_async(session: aiohttp.ClientSession, url: str):
+    """
+    Get all seasons (years) for a subject, fetching the page with an aiohttp
+    session. Parsing runs in the thread pool.
+    
+    Parameters:
+    session (aiohttp.ClientSession): Session to fetch the page with
+    url (str): The URL of the subject page
+    
+    Returns:
+    List of LinkClass objects
+    """
+    logger.debug("Fetching exam seasons from %s", url)
+    page = await _fetch_page_async(session, url)
+    return await run_in_threadpool(parse_exam_seasons, page, url)
+
+
+def parse_exam_seasons(page: str, url: str):
+    """
+    Get all seasons (years) from a subject page's HTML.
+    
+    Parameters:
+    page (str): HTML of the subject page
+    url (str): The URL of the subject page (relative links are resolved against it)
+    
+    Returns:
+    List of LinkClass objects
+    """
+    soup = BeautifulSoup(page, _PARSER, parse_only=_CAIE_LINKS)
     exam_seasons = []
     
     # Find all links that look like season links
-    all_links = soup.find_all('a', href=True)
+    all_links = soup.find_all('a')
+    # Paths of the seasons found so far, without any leading "/" (both forms
+    # of a link resolve to the same URL)
     seen_seasons = set()
     
     for a in all_links:
         href = a.get('href', '')
-        text = a.text.strip()
+        path = href[1:] if href[:1] == '/' else href
+        
+        # Skip repeats of a season before doing any more work on them
+        if path in seen_seasons or not path.startswith('papers/caie/'):
+            continue
         
         # Check if this looks like a season link
-        if (href.startswith('papers/caie/') or href.startswith('/papers/caie/')) and \
-           any(keyword in text.lower() or keyword in href.lower() 
-               for keyword in ['nov', 'june', 'march', 'may', 'oct', '202', '201']):
+        text = a.text.strip()
+        if _SEASON_KEYWORDS.search(text) or _SEASON_KEYWORDS.search(href):
             # Fix URL - if href is relative, make it absolute
-            if href.startswith('/'):
-                full_url = 'https://pastpapers.papacambridge.com' + href
-            elif href.startswith('papers/'):
-                full_url = 'https://pastpapers.papacambridge.com/' + href
-            else:
-                full_url = urljoin(url, href)
-            # Avoid duplicates
-            if full_url not in seen_seasons:
-                seen_seasons.add(full_url)
-                exam_seasons.append(LinkClass(text, full_url))
-                print(f'Found season: {text}')
+            full_url = _absolute_url(href, url)
+            seen_seasons.add(path)
+            exam_seasons.append(LinkClass(text, full_url))
+            logger.debug("Found season: %s", text)
     
     return exam_seasons
 
@@ -102,26 +310,48 @@ def get_exams(url: str):
     Returns:
     List of LinkClass objects
     """
-    print('Fetching individual exams...')
-    page = requests.get(url).text
-    soup = BeautifulSoup(page, "html.parser")
-    exams = []
+    logger.debug("Fetching individual exams from %s", url)
+    return parse_exams(_fetch_page(url))
+
+
+async def get_exams_async(session: aiohttp.ClientSession, url: str):
+    """
+    Get all individual exam files for a season, fetching the page with an
+    aiohttp session. Parsing runs in the thread pool.
     
-    # Find all download links that use download_file.php
-    download_links = soup.find_all('a', href=lambda x: x and 'download_file.php' in x)
+    Parameters:
+    session (aiohttp.ClientSession): Session to fetch the page with
+    url (str): The URL of the season page
     
-    for link in download_links:
-        href = link.get('href', '')
-        
-        # Extract the file URL from the download_file.php parameter
-        if 'files=' in href:
-            # Decode the URL parameter
-            file_url = unquote(href.split('files=')[1].split('&')[0])
-            # Extract filename from URL
-            exam_name = file_url.split('/')[-1]
-            
-            # Use the direct file URL for downloading
-            exams.append(LinkClass(exam_name, file_url))
-            print(f'Found exam file: {exam_name}')
+    Returns:
+    List of LinkClass objects
+    """
+    logger.debug("Fetching individual exams from %s", url)
+    page = await _fetch_page_async(session, url)
+    return await run_in_threadpool(parse_exams, page)
+
+
+def parse_exams(page: str):
+    """
+    Get all individual exam files from a season page's HTML.
+    
+    Parameters:
+    page (str): HTML of the season page
+    
+    Returns:
+    List of LinkClass objects
+    """
+    soup = BeautifulSoup(page, _PARSER, parse_only=_DOWNLOAD_LINKS)
+    
+    # Extract (and decode) the file URL from the download_file.php parameter
+    # of each download link
+    file_urls = [
+        unquote(match.group(1))
+        for match in (_FILES_PARAM.search(link.get('href', '')) for link in soup.find_all('a'))
+        if match
+    ]
     
+    # Use the direct file URLs for downloading, named after their filenames
+    exams = [LinkClass(file_url.rsplit('/', 1)[-1], file_url) for file_url in file_urls]
+    logger.debug("Found %d exam files", len(exams))
     return exams